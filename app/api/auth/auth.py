@@ -18,7 +18,7 @@ from app.core.security import (
     get_user_role
 )
 from app.core.config import settings, UserRole
-from app.models.user import User, UserSession, UserRoleEnum, UserStatusEnum
+from app.models.user import User, UserCredential, UserSession, UserRoleEnum, UserStatusEnum
 from app.api.auth.schemas import (
     AdminLoginRequest,
     AdminLoginResponse,
@@ -68,7 +68,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.email == email).first()
+    user = db.query(User).filter(User.with_email(email)).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -122,7 +122,7 @@ async def admin_login(
             )
         
         # Generate and send OTP
-        otp = otp_manager.generate_otp(request.email)
+        otp = await otp_manager.generate_otp(request.email)
         
         # Send OTP via email
         email_sent = email_service.send_otp_email(request.email, otp)
@@ -133,7 +133,7 @@ async def admin_login(
             )
         
         # Find or create admin user
-        admin_user = db.query(User).filter(User.email == request.email).first()
+        admin_user = db.query(User).filter(User.with_email(request.email)).first()
         if not admin_user:
             admin_user = User(
                 email=request.email,
@@ -176,14 +176,14 @@ async def verify_admin_otp(
     """
     try:
         # Verify OTP
-        if not otp_manager.verify_otp(request.email, request.otp):
+        if not await otp_manager.verify_otp(request.email, request.otp):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid or expired OTP"
             )
         
         # Get admin user
-        admin_user = db.query(User).filter(User.email == request.email).first()
+        admin_user = db.query(User).filter(User.with_email(request.email)).first()
         if not admin_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -242,18 +242,13 @@ async def register_engineer(
     """
     try:
         # Check if user already exists
-        existing_user = db.query(User).filter(User.email == request.email).first()
+        existing_user = db.query(User).filter(User.with_email(request.email)).first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User already exists with this email"
             )
         
-        # Hash password if provided
-        hashed_password = None
-        if request.password:
-            hashed_password = security_manager.get_password_hash(request.password)
-        
         # Create engineer user with pending status
         engineer = User(
             email=request.email,
@@ -261,7 +256,6 @@ async def register_engineer(
             phone_number=request.phone_number,
             role=UserRoleEnum.ENGINEER,
             status=UserStatusEnum.PENDING,
-            hashed_password=hashed_password,
             is_active=False,  # Inactive until approved
             is_verified=False,
             company_name=request.company_name,
@@ -280,6 +274,12 @@ async def register_engineer(
             }
         )
         
+        # Store the password hash if a password was provided
+        if request.password:
+            engineer.credential = UserCredential(
+                password_hash=security_manager.get_password_hash(request.password)
+            )
+        
         db.add(engineer)
         db.commit()
         db.refresh(engineer)
@@ -314,7 +314,7 @@ async def user_login(
     """
     try:
         # Find user
-        user = db.query(User).filter(User.email == request.email).first()
+        user = db.query(User).filter(User.with_email(request.email)).first()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -322,18 +322,26 @@ async def user_login(
             )
         
         # Verify password (if user has one)
-        if user.hashed_password:
+        credential = db.get(UserCredential, user.id)
+        if credential:
             if not request.password:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Password required"
                 )
             
-            if not security_manager.verify_password(request.password, user.hashed_password):
+            password_valid, new_hash = security_manager.verify_and_update_password(
+                request.password, credential.password_hash
+            )
+            if not password_valid:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid email or password"
                 )
+            
+            # Upgrade legacy bcrypt hashes; committed with the last login update below
+            if new_hash:
+                credential.password_hash = new_hash
         
         # Check user status
         if not user.is_active:
@@ -414,7 +422,7 @@ async def refresh_token(
             )
         
         # Find user
-        user = db.query(User).filter(User.email == email).first()
+        user = db.query(User).filter(User.with_email(email)).first()
         if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
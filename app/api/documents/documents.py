@@ -10,14 +10,16 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, status, Request, File, UploadFile, Form
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_, or_
+from sqlalchemy import JSON, String, cast, desc, func, and_, or_
 
 from app.core.database import get_db
 from app.core.security import security_manager
+from app.core.uploads import save_upload, UploadTooLargeError
 from app.core.config import settings
 from app.models.user import User, UserRoleEnum
 from app.models.knowledge_base import (
@@ -164,15 +166,14 @@ async def upload_document(
         # Save file
         file_path = get_upload_path(current_user.id, file.filename)
         
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            if len(content) > MAX_FILE_SIZE:
-                os.remove(file_path)
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE // (1024*1024)}MB"
-                )
-            buffer.write(content)
+        try:
+            file_size, file_hash = await save_upload(file, file_path, MAX_FILE_SIZE)
+        except UploadTooLargeError:
+            os.remove(file_path)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE // (1024*1024)}MB"
+            )
         
         # Determine document type
         file_ext = file.filename.split('.')[-1].lower()
@@ -196,10 +197,10 @@ async def upload_document(
             filename=file.filename,
             original_filename=file.filename,
             file_path=file_path,
-            file_size=len(content),
+            file_size=file_size,
             file_type=doc_type,
             mime_type=ALLOWED_EXTENSIONS.get(file_ext, 'application/octet-stream'),
-            file_hash="",  # TODO: Calculate SHA-256 hash
+            file_hash=file_hash,
             knowledge_base_tier=kb_tier,
             category=category,
             description=description,
@@ -214,6 +215,7 @@ async def upload_document(
         )
         
         db.add(document)
+        KnowledgeBaseStats.record_document(db, document)
         db.commit()
         db.refresh(document)
         
@@ -430,6 +432,19 @@ async def download_document(
         )
 
 
+def _any_tag_filter(db: Session, tags: List[str]):
+    """Filter for documents having at least one of tags"""
+    if db.get_bind().dialect.name == "mysql":
+        # JSON_OVERLAPS can be served by the multi-valued index on tags
+        return func.json_overlaps(Document.tags, cast(tags, JSON))
+    
+    # Portable fallback: match each tag as a JSON string element of the
+    # serialized array (other dialects have no JSON_OVERLAPS). The engine
+    # stores JSON through orjson, which keeps non-ASCII text as raw UTF-8
+    tags_text = cast(Document.tags, String)
+    return or_(*(tags_text.contains(orjson.dumps(tag).decode(), autoescape=True) for tag in tags))
+
+
 @router.post("/search", response_model=DocumentSearchResponse)
 async def search_documents(
     request: DocumentSearchRequest,
@@ -468,6 +483,9 @@ async def search_documents(
         if request.knowledge_base_tier is not None:
             query = query.filter(Document.knowledge_base_tier == request.knowledge_base_tier)
         
+        if request.tags:
+            query = query.filter(_any_tag_filter(db, request.tags))
+        
         # Apply date filters
         if request.date_from:
             query = query.filter(Document.created_at >= request.date_from)
@@ -513,7 +531,8 @@ async def search_documents(
                 "query": request.query,
                 "document_type": request.document_type.value if request.document_type else None,
                 "category": request.category,
-                "knowledge_base_tier": request.knowledge_base_tier
+                "knowledge_base_tier": request.knowledge_base_tier,
+                "tags": request.tags
             }
         )
         
@@ -8,7 +8,7 @@ from enum import Enum
 
 from pydantic import BaseModel, Field, validator
 
-from app.models.knowledge_base import DocumentTypeEnum, DocumentStatusEnum
+from app.models.knowledge_base import DocumentTypeEnum, DocumentStatusEnum, MAX_TAG_LENGTH
 
 
 class DocumentUploadResponse(BaseModel):
@@ -86,6 +86,7 @@ class DocumentSearchRequest(BaseModel):
     category: Optional[str] = Field(None, description="Filter by category")
     status: Optional[DocumentStatusEnum] = Field(None, description="Filter by status")
     knowledge_base_tier: Optional[int] = Field(None, description="Filter by knowledge base tier")
+    tags: Optional[List[str]] = Field(None, description="Filter documents having any of these tags")
     date_from: Optional[datetime] = Field(None, description="Filter documents from this date")
     date_to: Optional[datetime] = Field(None, description="Filter documents to this date")
     sort_by: SortByEnum = Field(SortByEnum.DATE, description="Sort results by")
@@ -98,6 +99,13 @@ class DocumentSearchRequest(BaseModel):
         if v is not None and (v < 1 or v > 3):
             raise ValueError('Knowledge base tier must be between 1 and 3')
         return v
+    
+    @validator('tags')
+    def validate_tags(cls, v):
+        """Validate tag lengths"""
+        if v is not None and any(len(tag) > MAX_TAG_LENGTH for tag in v):
+            raise ValueError(f'Tags must be at most {MAX_TAG_LENGTH} characters')
+        return v
 
 
 class DocumentSearchItem(BaseModel):
@@ -3,16 +3,19 @@ Query processing API endpoints for POORNASREE AI Platform
 Handles AI-powered query processing and knowledge base interactions
 """
 # pylint: disable=import-error,no-name-in-module,trailing-whitespace,logging-fstring-interpolation
+import asyncio
 import logging
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, update
 
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
 from app.core.security import security_manager, get_user_role
 from app.core.config import settings, UserRole, KnowledgeBaseTier
 from app.models.user import User, UserQuery, UserRoleEnum, LanguageEnum
@@ -150,22 +153,130 @@ async def process_query(
         )
 
 
+def _sse(event: str, data: Any) -> bytes:
+    """Encode one server-sent event"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+def _record_response(query_id: int, response_text: str, language: LanguageEnum,
+                     processing_time_ms: int, sources: List[Dict[str, Any]]) -> None:
+    """Store a streamed response on its UserQuery row, in a session of its own"""
+    with SessionLocal() as db:
+        db.execute(
+            update(UserQuery)
+            .where(UserQuery.id == query_id)
+            .values(
+                response_text=response_text,
+                response_language=language,
+                processing_time_ms=processing_time_ms,
+                responded_at=datetime.utcnow(),
+                documents_referenced=sources
+            )
+        )
+        db.commit()
+
+
+@router.post("/ask/stream")
+async def process_query_stream(
+    request: QueryRequest,
+    req: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Process a query and stream the AI response as server-sent events
+    
+    Emits a "metadata" event (query_id, sources, confidence), one "token"
+    event per response chunk, then "done" with the response time.
+    """
+    start_time = asyncio.get_event_loop().time()
+    kb_tier = determine_knowledge_base_tier(current_user.role)
+    language = LanguageEnum.ENGLISH if (request.language or "en") == "en" else LanguageEnum.HINDI
+    
+    user_query = UserQuery(
+        user_id=current_user.id,
+        query_text=request.query,
+        query_language=language,
+        query_type=request.query_type,
+        knowledge_base_tier=kb_tier.value,
+        ip_address=req.client.host if req.client else None,
+        user_agent=req.headers.get("user-agent"),
+        device_info={
+            "language": request.language or "en",
+            "context": request.context
+        }
+    )
+    db.add(user_query)
+    db.commit()
+    query_id = user_query.id
+    
+    try:
+        metadata, chunks = await ai_service.process_query_stream(
+            query=request.query,
+            user_role=current_user.role.value,
+            knowledge_base_tier=kb_tier.value
+        )
+    except Exception as e:
+        logger.error("Query processing error: %s", str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+    
+    sources = metadata.get("sources", [])
+    
+    async def events():
+        yield _sse("metadata", {
+            "query_id": query_id,
+            "sources": sources,
+            "confidence_score": metadata.get("confidence", 0.5),
+            "knowledge_base_tier": kb_tier.value
+        })
+        parts = []
+        try:
+            async for chunk in chunks:
+                parts.append(chunk)
+                yield _sse("token", chunk)
+        except Exception as e:
+            logger.error("Streaming response failed for query %s: %s", query_id, e)
+            yield _sse("error", {"message": "Response generation failed"})
+            return
+        
+        response_time = asyncio.get_event_loop().time() - start_time
+        await asyncio.to_thread(
+            _record_response, query_id, "".join(parts), language, int(response_time * 1000), sources
+        )
+        yield _sse("done", {"response_time": response_time})
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @router.get("/history", response_model=List[QueryHistoryResponse])
 async def get_query_history(
+    response: Response,
     limit: int = 20,
     offset: int = 0,
+    before_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get user's query history
+    Get user's query history, newest first
+    Pass the X-Next-Before-Id header value back as before_id to fetch the next page
     """
     try:
-        queries = db.query(UserQuery).filter(
-            UserQuery.user_id == current_user.id
-        ).order_by(
-            desc(UserQuery.created_at)
-        ).offset(offset).limit(limit).all()
+        query = db.query(UserQuery).filter(UserQuery.user_id == current_user.id)
+        
+        # Keyset pagination seeks straight to the page instead of skipping rows
+        if before_id is not None:
+            query = query.filter(UserQuery.id < before_id)
+            offset = 0
+        
+        queries = query.order_by(desc(UserQuery.id)).offset(offset).limit(limit).all()
+        
+        # A short page is the last one, so there is no next cursor
+        if len(queries) == limit:
+            response.headers["X-Next-Before-Id"] = str(queries[-1].id)
         
         return [
             QueryHistoryResponse(
@@ -7,16 +7,18 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 
+from app.api.types import ShortText, UrlText, LongText
+
 
 class TrainingJobRequest(BaseModel):
     """Training job creation request schema"""
     name: str = Field(..., min_length=1, max_length=500, description="Training job name")
-    description: Optional[str] = Field(None, max_length=2000, description="Training job description")
+    description: Optional[LongText] = Field(None, description="Training job description")
     training_type: str = Field(..., description="Training type: full, incremental, batch, real_time")
     model_type: str = Field(..., description="Model type: embedding, classification, generation, retrieval")
     knowledge_base_tier: int = Field(..., ge=1, le=3, description="Knowledge base tier (1-3)")
-    document_ids: Optional[List[int]] = Field(default=[], description="Specific document IDs to train on")
-    training_config: Dict[str, Any] = Field(default={}, description="Training configuration parameters")
+    document_ids: List[int] = Field(default_factory=list, description="Specific document IDs to train on")
+    training_config: Dict[str, Any] = Field(default_factory=dict, description="Training configuration parameters")
     
     @field_validator('training_type')
     @classmethod
@@ -70,6 +72,8 @@ class TrainingJobResponse(BaseModel):
     estimated_duration_minutes: Optional[int] = Field(None, description="Estimated duration in minutes")
     actual_duration_minutes: Optional[int] = Field(None, description="Actual duration in minutes")
     error_message: Optional[str] = Field(None, description="Error message if failed")
+    documents_count: int = Field(0, description="Number of linked documents")
+    model_versions_count: int = Field(0, description="Number of model versions produced")
     created_by: str = Field(..., description="Creator email")
     created_at: datetime = Field(..., description="Creation timestamp")
     started_at: Optional[datetime] = Field(None, description="Start timestamp")
@@ -147,9 +151,9 @@ class FeedbackRequest(BaseModel):
     query_id: int = Field(..., description="Query ID this feedback relates to")
     feedback_type: str = Field(..., description="Feedback type: rating, comment, bug_report")
     rating: Optional[int] = Field(None, ge=1, le=5, description="Rating (1-5 stars)")
-    feedback_text: Optional[str] = Field(None, max_length=2000, description="Feedback text")
-    feature_used: Optional[str] = Field(None, max_length=255, description="Feature being used")
-    page_url: Optional[str] = Field(None, max_length=1000, description="Page URL")
+    feedback_text: Optional[LongText] = Field(None, description="Feedback text")
+    feature_used: Optional[ShortText] = Field(None, description="Feature being used")
+    page_url: Optional[UrlText] = Field(None, description="Page URL")
     
     @field_validator('feedback_type')
     @classmethod
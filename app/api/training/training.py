@@ -4,15 +4,21 @@ Handles model training, versioning, feedback collection, and batch processing
 """
 # pylint: disable=not-callable,no-member,import-error,no-name-in-module,trailing-whitespace,unused-import,wrong-import-order
 
+import asyncio
 import logging
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+import time
+from typing import Any, Dict, List, Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.security import security_manager
 from app.models.user import User, UserRoleEnum
+from app.models.training import TrainingJob, ModelVersion
 from app.services.training_service import training_service
 from app.api.training.schemas import (
     TrainingJobRequest, TrainingJobResponse, ModelVersionResponse,
@@ -25,6 +31,74 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/training", tags=["training"])
 security = HTTPBearer()
 
+# Highest knowledge base tier each role may access
+MAX_TIER_BY_ROLE = {
+    UserRoleEnum.CUSTOMER: 1,
+    UserRoleEnum.ENGINEER: 2,
+    UserRoleEnum.ADMIN: 3
+}
+
+
+def json_response(content: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Encode content straight to a JSON response with orjson
+    
+    Returning a Response bypasses FastAPI's response_model validation and
+    jsonable_encoder pass; response_model is still declared for OpenAPI docs.
+    """
+    return Response(content=orjson.dumps(content), media_type="application/json", headers=headers)
+
+
+def _job_to_dict(job: TrainingJob) -> Dict[str, Any]:
+    """Serialize a TrainingJob to the TrainingJobResponse shape, for json_response"""
+    return {name: getattr(job, name) for name in TrainingJob._LIST_FIELDS}  # pylint: disable=protected-access
+
+
+def _model_version_to_dict(version: ModelVersion) -> Dict[str, Any]:
+    """Serialize a ModelVersion to the ModelVersionResponse shape"""
+    return {
+        "id": version.id,
+        "training_job_id": version.training_job_id,
+        "version_number": version.version_number,
+        "version_name": version.version_name,
+        "description": version.description,
+        "model_type": version.model_type.value,
+        "knowledge_base_tier": version.knowledge_base_tier,
+        "model_size_mb": version.model_size_mb,
+        "accuracy_score": version.accuracy_score,
+        "precision_score": version.precision_score,
+        "recall_score": version.recall_score,
+        "f1_score": version.f1_score,
+        "is_deployed": version.is_deployed,
+        "deployment_environment": version.deployment_environment,
+        "created_at": version.created_at,
+        "deployed_at": version.deployed_at
+    }
+
+
+# Training metrics change slowly; cache them briefly so dashboard polling
+# does not re-run the aggregation queries on every request
+METRICS_CACHE_TTL_SECONDS = 5.0
+_metrics_cache: Dict[str, Any] = {}
+_metrics_lock = asyncio.Lock()
+
+
+async def _get_cached_training_metrics(db: Session) -> Dict[str, Any]:
+    """Get training metrics, reusing a result computed within the last few seconds"""
+    async with _metrics_lock:
+        now = time.monotonic()
+        if _metrics_cache and now - _metrics_cache["computed_at"] < METRICS_CACHE_TTL_SECONDS:
+            return _metrics_cache["metrics"]
+        
+        metrics = await run_in_threadpool(training_service.get_training_metrics, db)
+        
+        # Don't cache the empty result returned on failure
+        if metrics:
+            _metrics_cache["metrics"] = metrics
+            _metrics_cache["computed_at"] = now
+        
+        return metrics
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -91,26 +165,7 @@ async def create_training_job(
             db=db
         )
         
-        return TrainingJobResponse(
-            id=training_job.id,
-            name=training_job.name,
-            description=training_job.description,
-            training_type=training_job.training_type.value,
-            model_type=training_job.model_type.value,
-            knowledge_base_tier=training_job.knowledge_base_tier,
-            status=training_job.status.value,
-            progress_percentage=training_job.progress_percentage,
-            current_step=training_job.current_step,
-            total_steps=training_job.total_steps,
-            final_score=training_job.final_score,
-            estimated_duration_minutes=training_job.estimated_duration_minutes,
-            actual_duration_minutes=training_job.actual_duration_minutes,
-            error_message=training_job.error_message,
-            created_by=training_job.created_by,
-            created_at=training_job.created_at,
-            started_at=training_job.started_at,
-            completed_at=training_job.completed_at
-        )
+        return json_response(_job_to_dict(training_job))
         
     except HTTPException:
         raise
@@ -204,12 +259,14 @@ async def get_training_jobs(
     limit: int = 20,
     status: Optional[str] = None,
     created_by: Optional[str] = None,
+    before_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get training jobs with filters
     Admin users see all jobs, others see only their own
+    Pass the X-Next-Before-Id header value back as before_id to fetch the next page
     """
     try:
         # Filter by user for non-admin users
@@ -221,32 +278,14 @@ async def get_training_jobs(
             skip=skip,
             limit=limit,
             status=status,
-            created_by=created_by
+            created_by=created_by,
+            before_id=before_id
         )
         
-        return [
-            TrainingJobResponse(
-                id=job.id,
-                name=job.name,
-                description=job.description,
-                training_type=job.training_type.value,
-                model_type=job.model_type.value,
-                knowledge_base_tier=job.knowledge_base_tier,
-                status=job.status.value,
-                progress_percentage=job.progress_percentage,
-                current_step=job.current_step,
-                total_steps=job.total_steps,
-                final_score=job.final_score,
-                estimated_duration_minutes=job.estimated_duration_minutes,
-                actual_duration_minutes=job.actual_duration_minutes,
-                error_message=job.error_message,
-                created_by=job.created_by,
-                created_at=job.created_at,
-                started_at=job.started_at,
-                completed_at=job.completed_at
-            )
-            for job in training_jobs
-        ]
+        # A short page is the last one, so there is no next cursor
+        headers = {"X-Next-Before-Id": str(training_jobs[-1]["id"])} if len(training_jobs) == limit else None
+        
+        return json_response(training_jobs, headers=headers)
         
     except Exception as e:
         logger.error(f"Failed to get training jobs: {e}")
@@ -262,49 +301,31 @@ async def get_model_versions(
     limit: int = 20,
     knowledge_base_tier: Optional[int] = None,
     deployed_only: bool = False,
+    before_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get model versions with filters
     Engineers and admins can access based on their tier
+    Pass the X-Next-Before-Id header value back as before_id to fetch the next page
     """
     try:
-        # Filter by access tier for non-admin users
-        if current_user.role == UserRoleEnum.CUSTOMER:
-            knowledge_base_tier = 1
-        elif current_user.role == UserRoleEnum.ENGINEER and knowledge_base_tier and knowledge_base_tier > 2:
-            knowledge_base_tier = 2
-        
+        # The requested tier is capped at the highest tier the user's role may access
         model_versions = training_service.get_model_versions(
             db=db,
             skip=skip,
             limit=limit,
             knowledge_base_tier=knowledge_base_tier,
-            deployed_only=deployed_only
+            deployed_only=deployed_only,
+            before_id=before_id,
+            max_tier=MAX_TIER_BY_ROLE.get(current_user.role, 1)
         )
         
-        return [
-            ModelVersionResponse(
-                id=version.id,
-                training_job_id=version.training_job_id,
-                version_number=version.version_number,
-                version_name=version.version_name,
-                description=version.description,
-                model_type=version.model_type.value,
-                knowledge_base_tier=version.knowledge_base_tier,
-                model_size_mb=version.model_size_mb,
-                accuracy_score=version.accuracy_score,
-                precision_score=version.precision_score,
-                recall_score=version.recall_score,
-                f1_score=version.f1_score,
-                is_deployed=version.is_deployed,
-                deployment_environment=version.deployment_environment,
-                created_at=version.created_at,
-                deployed_at=version.deployed_at
-            )
-            for version in model_versions
-        ]
+        # A short page is the last one, so there is no next cursor
+        headers = {"X-Next-Before-Id": str(model_versions[-1].id)} if len(model_versions) == limit else None
+        
+        return json_response([_model_version_to_dict(version) for version in model_versions], headers=headers)
         
     except Exception as e:
         logger.error(f"Failed to get model versions: {e}")
@@ -375,7 +396,7 @@ async def get_training_metrics(
                 detail="Insufficient permissions to access training metrics"
             )
         
-        metrics = training_service.get_training_metrics(db)
+        metrics = await _get_cached_training_metrics(db)
         
         return TrainingMetricsResponse(**metrics)
         
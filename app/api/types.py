@@ -0,0 +1,13 @@
+"""
+Shared constrained field types for API schemas
+"""
+# pylint: disable=import-error,no-name-in-module
+from typing import Annotated
+
+from pydantic import StringConstraints
+
+# Length limits live in the type so they are checked by pydantic-core's
+# compiled string validator and the same constraint is reused across schemas
+ShortText = Annotated[str, StringConstraints(max_length=255)]
+UrlText = Annotated[str, StringConstraints(max_length=1000)]
+LongText = Annotated[str, StringConstraints(max_length=2000)]
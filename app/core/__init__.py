@@ -4,7 +4,7 @@ Core package for POORNASREE AI Platform
 
 from .config import settings, UserRole, KnowledgeBaseAccess, KnowledgeBaseTier
 from .database import get_db, init_db, close_db
-from .security import security_manager, otp_manager, email_service
+from .security import get_security_manager, get_otp_manager, get_email_service
 
 __all__ = [
     "settings",
@@ -16,5 +16,16 @@ __all__ = [
     "close_db",
     "security_manager",
     "otp_manager",
-    "email_service"
+    "email_service",
+    "get_security_manager",
+    "get_otp_manager",
+    "get_email_service"
 ]
+
+
+def __getattr__(name: str):
+    """Re-export the lazily created security instances (PEP 562)"""
+    if name in ("security_manager", "otp_manager", "email_service"):
+        from . import security
+        return getattr(security, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,8 +4,15 @@ Configuration management for POORNASREE AI Platform
 # pylint: disable=import-error,no-name-in-module
 from pydantic import Field
 from pydantic_settings import BaseSettings
+from enum import IntEnum, StrEnum
+from functools import cached_property, lru_cache
 from typing import List, Optional
 import os
+import re
+
+# Byte multipliers for MAX_FILE_SIZE suffixes
+_SIZE_SUFFIXES = {"GB": 1 << 30, "MB": 1 << 20, "KB": 1 << 10, "B": 1}
+_SIZE_PATTERN = re.compile(r"\s*(\d+)\s*([KMG]?B)\s*")
 
 
 class Settings(BaseSettings):
@@ -20,6 +27,8 @@ class Settings(BaseSettings):
     # Database Configuration
     database_url: str = Field(alias="DATABASE_URL")
     database_echo: bool = Field(default=False, alias="DATABASE_ECHO")
+    database_ssl_ca: Optional[str] = Field(default=None, alias="DATABASE_SSL_CA")
+    database_strict_loading: bool = Field(default=False, alias="DATABASE_STRICT_LOADING")
     
     # JWT Configuration
     secret_key: str = Field(alias="SECRET_KEY")
@@ -27,6 +36,10 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = Field(default=30, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
     refresh_token_expire_days: int = Field(default=7, alias="REFRESH_TOKEN_EXPIRE_DAYS")
     
+    # Password Hashing Configuration (argon2id cost parameters)
+    password_hash_rounds: int = Field(default=2, alias="PASSWORD_HASH_ROUNDS")
+    password_hash_memory_kb: int = Field(default=19456, alias="PASSWORD_HASH_MEMORY_KB")
+    
     # Admin Configuration
     admin_email: str = Field(alias="ADMIN_EMAIL")
     admin_otp_expire_minutes: int = Field(default=5, alias="ADMIN_OTP_EXPIRE_MINUTES")
@@ -66,6 +79,12 @@ class Settings(BaseSettings):
     
     # Vector Configuration
     vector_embedding_size: int = Field(default=1536, alias="VECTOR_EMBEDDING_SIZE")
+    embedding_backend: str = Field(default="onnx", alias="EMBEDDING_BACKEND")  # onnx or torch
+    embedding_onnx_file: str = Field(default="onnx/model_qint8_avx512_vnni.onnx", alias="EMBEDDING_ONNX_FILE")
+    embedding_cache_ttl_seconds: int = Field(default=604800, alias="EMBEDDING_CACHE_TTL_SECONDS")
+    embedding_memory_cache_size: int = Field(default=10000, alias="EMBEDDING_MEMORY_CACHE_SIZE")
+    response_cache_min_similarity: float = Field(default=0.95, alias="RESPONSE_CACHE_MIN_SIMILARITY")
+    response_cache_ttl_seconds: int = Field(default=86400, alias="RESPONSE_CACHE_TTL_SECONDS")
     
     # Audio Configuration
     audio_sample_rate: int = Field(default=16000, alias="AUDIO_SAMPLE_RATE")
@@ -104,31 +123,41 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = False
         
-    @property
+    @cached_property
     def max_file_size_bytes(self) -> int:
-        """Convert max file size string to bytes"""
+        """Convert max file size string to bytes (parsed once per instance)"""
         size_str = str(self.max_file_size).upper()
-        if size_str.endswith("MB"):
-            return int(size_str[:-2]) * 1024 * 1024
-        elif size_str.endswith("KB"):
-            return int(size_str[:-2]) * 1024
-        elif size_str.endswith("GB"):
-            return int(size_str[:-2]) * 1024 * 1024 * 1024
-        else:
+        match = _SIZE_PATTERN.fullmatch(size_str)
+        if match is None:
             return int(size_str)
+        return int(match[1]) * _SIZE_SUFFIXES[match[2]]
     
-    @property
+    @cached_property
     def allowed_file_types_list(self) -> List[str]:
-        """Convert allowed file types string to list"""
+        """Convert allowed file types string to list (parsed once per instance)"""
         return [ext.strip().lower() for ext in str(self.allowed_file_types).split(",")]
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the global settings instance
+    
+    Settings are parsed from the environment on first use rather than at
+    import time, so scripts that only need the constants below skip it.
+    """
+    return Settings()
+
+
+def __getattr__(name: str):
+    """Resolve the global `settings` instance lazily (PEP 562)"""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Knowledge Base Access Levels
-class KnowledgeBaseAccess:
+class KnowledgeBaseAccess(StrEnum):
     """Knowledge base access level constants"""
     CUSTOMER = "customer"
     ENGINEER = "engineer"
@@ -136,7 +165,7 @@ class KnowledgeBaseAccess:
 
 
 # User Roles
-class UserRole:
+class UserRole(StrEnum):
     """User role constants"""
     CUSTOMER = "customer"
     ENGINEER = "engineer"
@@ -144,7 +173,7 @@ class UserRole:
 
 
 # Knowledge Base Tiers
-class KnowledgeBaseTier:
+class KnowledgeBaseTier(IntEnum):
     """Knowledge base tier constants"""
     TIER_1_CUSTOMER = 1  # Customer knowledge base
     TIER_2_ENGINEER = 2  # Service engineer knowledge base
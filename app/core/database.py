@@ -2,47 +2,99 @@
 Database configuration and session management for POORNASREE AI Platform
 """
 # pylint: disable=import-error,no-name-in-module
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import BigInteger, DDL, Integer, String, Table, create_engine, event, insert, inspect, MetaData, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.visitors import InternalTraversal
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
-from typing import Generator
+from functools import lru_cache
+from typing import Any, Dict, Generator, List, Tuple, Union
+import asyncio
 import logging
+import ssl
+
+import orjson
 
 from app.core.config import settings
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=1)
+def get_ssl_context() -> ssl.SSLContext:
+    """
+    Get the TLS context for Azure MySQL, built once per process
+    
+    Verifies the server certificate and hostname against DATABASE_SSL_CA
+    (e.g. DigiCertGlobalRootCA.crt.pem) or the system CA bundle.
+    """
+    ssl_context = ssl.create_default_context(cafile=settings.database_ssl_ca)
+    ssl_context.check_hostname = True
+    ssl_context.verify_mode = ssl.CERT_REQUIRED
+    return ssl_context
+
+
 # Create SQLAlchemy engine with connection pooling
 # SSL configuration for Azure MySQL
 connect_args = {
     "charset": "utf8mb4",
     "autocommit": False,
+    "connect_timeout": 5,
 }
 
+# Azure MySQL's load balancer drops connections idle for 240s; recycling
+# below that replaces the per-checkout SELECT 1 of pool_pre_ping
+POOL_RECYCLE_SECONDS = 180
+
+# Compiled-statement LRU per engine; sized above the number of distinct
+# statement shapes the app builds, so hot queries never recompile
+QUERY_CACHE_SIZE = 1200
+
 # Add SSL configuration for Azure MySQL
 database_url_str = str(settings.database_url)
 if "azure" in database_url_str or "mysql.database.azure.com" in database_url_str:
-    import ssl
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
     connect_args.update({
-        "ssl": ssl_context,
+        "ssl": get_ssl_context(),
     })
 
+
+def _json_serializer(value: Any) -> str:
+    """Serialize JSON column values with orjson (SQLAlchemy expects str)"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 engine = create_engine(
     settings.database_url,
     echo=settings.database_echo,
     poolclass=QueuePool,
     pool_size=10,
     max_overflow=20,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    connect_args=connect_args
+    pool_recycle=POOL_RECYCLE_SECONDS,
+    query_cache_size=QUERY_CACHE_SIZE,
+    connect_args=connect_args,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads
 )
 
+# Number of errors the driver reported as disconnects, to check that the
+# recycle window is short enough
+disconnect_count = 0
+
+
+def _count_disconnect(context) -> None:
+    """Count disconnect errors raised on pooled connections"""
+    global disconnect_count
+    
+    if context.is_disconnect:
+        disconnect_count += 1
+        logger.warning("Database disconnect detected (total: %d)", disconnect_count)
+
+
+event.listen(engine, "handle_error", _count_disconnect)
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -50,12 +102,154 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+
 # Create Base class for models
 Base = declarative_base()
 
+# Loader strategy for collections that callers are expected to eager-load
+# (selectinload) when they need them; DATABASE_STRICT_LOADING turns an
+# accidental per-row lazy load into an error instead of an N+1
+LAZY_COLLECTION = "raise_on_sql" if settings.database_strict_loading else "select"
+
+# 64-bit auto-increment key for high-volume tables; SQLite only
+# auto-increments INTEGER PRIMARY KEY, so it keeps that there
+BIG_INTEGER_ID = BigInteger().with_variant(Integer, "sqlite")
+
+# InnoDB transparent page compression for tables dominated by large text
+# columns; MySQL wants the value quoted, hence the inner quotes
+LZ4_TABLE_OPTIONS = {"mysql_compression": "'lz4'"}
+
+
+def maintain_updated_at(table: Table) -> None:
+    """
+    Have MySQL set table.updated_at on every row UPDATE with a BEFORE UPDATE trigger
+    
+    Raw SQL and bulk UPDATEs are covered too, and ORM UPDATEs no longer bind
+    a timestamp. Declare the column with server_onupdate=FetchedValue() so
+    the ORM expires it after a flush.
+    """
+    event.listen(
+        table,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER trg_{table.name}_updated_at BEFORE UPDATE ON {table.name} "
+            "FOR EACH ROW SET NEW.updated_at = CURRENT_TIMESTAMP"
+        ).execute_if(dialect="mysql")
+    )
+
+
+def json_key_sql(column_name: str, key: str, length: int) -> str:
+    """
+    MySQL expression behind the functional indexes on JSON keys
+    
+    The index DDL and json_key_text() both render this text, so a filter
+    always matches the indexed expression exactly (including the binary
+    collation, which makes comparisons case-sensitive).
+    """
+    return f"(CAST({column_name}->>'$.{key}' AS CHAR({length})) COLLATE utf8mb4_bin)"
+
+
+def json_key_index(table: Table, name: str, column_name: str, key: str, length: int, *leading: str) -> None:
+    """Create a MySQL functional index on one JSON key after table is created"""
+    columns = ", ".join(leading + (json_key_sql(column_name, key, length),))
+    event.listen(
+        table,
+        "after_create",
+        DDL(f"CREATE INDEX {name} ON {table.name} ({columns})").execute_if(dialect="mysql")
+    )
+
+
+class json_key_text(ColumnElement):  # pylint: disable=invalid-name
+    """
+    Text value of a JSON key, written so MySQL can use a json_key_index()
+    
+    Compare it with == (e.g. json_key_text(Model.data, "path", 255) == value);
+    other databases get a plain JSON extraction.
+    """
+    
+    inherit_cache = True
+    _traverse_internals = [
+        ("column", InternalTraversal.dp_clauseelement),
+        ("key", InternalTraversal.dp_string),
+        ("length", InternalTraversal.dp_plain_obj),
+    ]
+    
+    def __init__(self, column, key: str, length: int):
+        self.column = column
+        self.key = key
+        self.length = length
+        self.type = String(length)
+
+
+@compiles(json_key_text)
+def _compile_json_key_text(element, compiler, **kw):
+    return compiler.process(element.column[element.key].as_string(), **kw)
+
+
+@compiles(json_key_text, "mysql")
+def _compile_json_key_text_mysql(element, compiler, **kw):
+    return json_key_sql(compiler.process(element.column, **kw), element.key, element.length)
+
+
+class ReprMixin:
+    """
+    Shared __repr__ built from the attribute names in __repr_fields__
+    
+    Attributes that are not loaded (deferred, expired or detached) are
+    skipped rather than read, so printing a model never emits a SELECT.
+    """
+    
+    __repr_fields__: Tuple[str, ...] = ("id",)
+    
+    def __repr__(self):
+        unloaded = inspect(self).unloaded
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for name in self.__repr_fields__
+            if name not in unloaded
+        )
+        return f"<{type(self).__name__}({fields})>"
+
+
+class BulkInsertMixin:
+    """
+    Bulk-load support for append-only models (telemetry, audit logs, datasets)
+    
+    Rows go through executemany INSERTs, which pymysql rewrites into
+    multi-row INSERT ... VALUES batches, instead of a session.add() per row.
+    """
+    
+    BULK_BATCH_SIZE = 10_000
+    
+    @classmethod
+    def bulk_load(cls, session: Session, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert plain row dicts without building ORM instances
+        
+        Rows are sent BULK_BATCH_SIZE at a time so one call never builds an
+        INSERT larger than max_allowed_packet; all batches share the
+        caller's transaction.
+        
+        Args:
+            session: Database session; the caller commits
+            rows: Column name to value mappings
+            
+        Returns:
+            int: Number of rows inserted
+        """
+        statement = insert(cls.__table__)
+        batch_size = cls.BULK_BATCH_SIZE
+        for start in range(0, len(rows), batch_size):
+            session.execute(statement, rows[start:start + batch_size])
+        return len(rows)
+
 # Metadata for migrations
 metadata = MetaData()
 
+# init_db runs its table check once per process
+_tables_initialized = False
+_init_lock = asyncio.Lock()
+
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -68,7 +262,7 @@ def get_db() -> Generator[Session, None, None]:
     try:
         yield db
     except Exception as e:
-        logger.error(f"Database session error: {e}")
+        logger.error("Database session error: %s", e)
         db.rollback()
         raise
     finally:
@@ -78,18 +272,38 @@ def get_db() -> Generator[Session, None, None]:
 async def init_db() -> None:
     """
     Initialize database tables
+    
+    Runs once per process. Existing tables are listed in a single round-trip
+    and only missing ones are created, instead of create_all probing each
+    table individually.
     """
-    try:
-        # Import all models to ensure they are registered with SQLAlchemy
-        from app.models import user, knowledge_base, analytics, training
-        
-        # Create all tables
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
+    global _tables_initialized
+    
+    async with _init_lock:
+        if _tables_initialized:
+            return
         
-    except Exception as e:
-        logger.error(f"Failed to initialize database: {e}")
-        raise
+        try:
+            # Import all models to ensure they are registered with SQLAlchemy
+            from app.models import user, knowledge_base, analytics, training
+            
+            existing_tables = set(inspect(engine).get_table_names())
+            missing_tables = [
+                table for table in Base.metadata.sorted_tables
+                if table.name not in existing_tables
+            ]
+            
+            if missing_tables:
+                Base.metadata.create_all(bind=engine, tables=missing_tables)
+                logger.info("Created %d database tables", len(missing_tables))
+            else:
+                logger.info("Database tables already exist")
+            
+            _tables_initialized = True
+            
+        except Exception as e:
+            logger.error("Failed to initialize database: %s", e)
+            raise
 
 
 async def close_db() -> None:
@@ -100,7 +314,7 @@ async def close_db() -> None:
         engine.dispose()
         logger.info("Database connections closed")
     except Exception as e:
-        logger.error(f"Error closing database connections: {e}")
+        logger.error("Error closing database connections: %s", e)
 
 
 class DatabaseManager:
@@ -114,29 +328,37 @@ class DatabaseManager:
         """Get a new database session"""
         return self.SessionLocal()
     
-    def execute_query(self, query: str, params: dict = None):
-        """Execute a raw SQL query"""
-        with self.get_session() as session:
-            try:
-                result = session.execute(query, params or {})
-                session.commit()
-                return result
-            except Exception as e:
-                session.rollback()
-                logger.error(f"Query execution error: {e}")
-                raise
+    def execute_query(self, query: str, params: dict = None) -> Union[List[Dict[str, Any]], int]:
+        """
+        Execute a raw SQL query on a bare connection in its own transaction
+        
+        Rows are read before the connection is released, so a SELECT returns
+        its rows as dicts; other statements return the affected row count.
+        """
+        try:
+            with self.engine.begin() as conn:
+                # text() is keyed by its SQL string in the engine's compiled
+                # cache (query_cache_size), so repeats skip recompilation
+                result = conn.execute(text(query), params or {})
+                if result.returns_rows:
+                    return [dict(row) for row in result.mappings()]
+                return result.rowcount
+        except Exception as e:
+            logger.error("Query execution error: %s", e)
+            raise
     
     def bulk_insert(self, model_class, data_list: list):
         """Bulk insert data"""
-        with self.get_session() as session:
-            try:
-                session.bulk_insert_mappings(model_class, data_list)
-                session.commit()
-                logger.info(f"Bulk inserted {len(data_list)} records")
-            except Exception as e:
-                session.rollback()
-                logger.error(f"Bulk insert error: {e}")
-                raise
+        # An empty executemany would run one INSERT with no values
+        if not data_list:
+            return
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(model_class.__table__), data_list)
+            logger.info("Bulk inserted %d records", len(data_list))
+        except Exception as e:
+            logger.error("Bulk insert error: %s", e)
+            raise
 
 
 # Global database manager instance
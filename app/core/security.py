@@ -3,35 +3,58 @@ Security utilities for POORNASREE AI Platform
 Handles authentication, authorization, and security operations
 """
 from datetime import datetime, timedelta
-from typing import Optional, Union, Dict, Any
-from jose import JWTError, jwt
+from functools import lru_cache
+from typing import Optional, Union, Dict, Any, Tuple
+import jwt
+import orjson
+from jwt import PyJWTError, api_jws
 from passlib.context import CryptContext
 from passlib.hash import bcrypt
 import secrets
-import random
-import string
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from calendar import timegm
+from string import Template
+import threading
+from email.message import EmailMessage
 import logging
 
+import redis.asyncio as aioredis
+
 from app.core.config import settings, UserRole
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache(maxsize=1)
+def get_pwd_context() -> CryptContext:
+    """
+    Get the password hashing context
+    
+    New hashes use argon2id; existing bcrypt hashes still verify and are
+    upgraded on the next successful login (see verify_and_update_password)
+    """
+    return CryptContext(
+        schemes=["argon2", "bcrypt"],
+        deprecated="auto",
+        argon2__type="ID",
+        argon2__time_cost=settings.password_hash_rounds,
+        argon2__memory_cost=settings.password_hash_memory_kb,
+        argon2__parallelism=1
+    )
+
+
+@lru_cache(maxsize=1)
+def _admin_email_lower() -> str:
+    """Admin email never changes at runtime, normalize it once"""
+    return str(settings.admin_email).lower()
 
 
 class SecurityManager:
     """Handles all security-related operations"""
     
-    def __init__(self):
-        self.secret_key = settings.secret_key
-        self.algorithm = settings.algorithm
-        self.access_token_expire_minutes = settings.access_token_expire_minutes
-        self.refresh_token_expire_days = settings.refresh_token_expire_days
+    # Stateless: configuration is read from settings on use
+    __slots__ = ()
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """
@@ -45,11 +68,29 @@ class SecurityManager:
             bool: True if password matches, False otherwise
         """
         try:
-            return pwd_context.verify(plain_password, hashed_password)
+            return get_pwd_context().verify(plain_password, hashed_password)
         except Exception as e:
-            logger.error(f"Password verification error: {e}")
+            logger.error("Password verification error: %s", e)
             return False
     
+    def verify_and_update_password(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and re-hash it if the stored hash is outdated
+        
+        Args:
+            plain_password: Plain text password
+            hashed_password: Hashed password from database
+            
+        Returns:
+            Tuple[bool, Optional[str]]: Whether the password matches, and a new
+            hash to persist when the stored one uses a deprecated scheme or cost
+        """
+        try:
+            return get_pwd_context().verify_and_update(plain_password, hashed_password)
+        except Exception as e:
+            logger.error("Password verification error: %s", e)
+            return False, None
+    
     def get_password_hash(self, password: str) -> str:
         """
         Hash a password
@@ -61,9 +102,9 @@ class SecurityManager:
             str: Hashed password
         """
         try:
-            return pwd_context.hash(password)
+            return get_pwd_context().hash(password)
         except Exception as e:
-            logger.error(f"Password hashing error: {e}")
+            logger.error("Password hashing error: %s", e)
             raise
     
     def create_access_token(self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -82,15 +123,14 @@ class SecurityManager:
         if expires_delta:
             expire = datetime.utcnow() + expires_delta
         else:
-            expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
+            expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
         
         to_encode.update({"exp": expire, "type": "access"})
         
         try:
-            encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
-            return encoded_jwt
+            return self._encode_token(to_encode)
         except Exception as e:
-            logger.error(f"Token creation error: {e}")
+            logger.error("Token creation error: %s", e)
             raise
     
     def create_refresh_token(self, data: Dict[str, Any]) -> str:
@@ -104,16 +144,25 @@ class SecurityManager:
             str: JWT refresh token
         """
         to_encode = data.copy()
-        expire = datetime.utcnow() + timedelta(days=self.refresh_token_expire_days)
+        expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
         to_encode.update({"exp": expire, "type": "refresh"})
         
         try:
-            encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
-            return encoded_jwt
+            return self._encode_token(to_encode)
         except Exception as e:
-            logger.error(f"Refresh token creation error: {e}")
+            logger.error("Refresh token creation error: %s", e)
             raise
     
+    def _encode_token(self, claims: Dict[str, Any]) -> str:
+        """
+        Sign token claims
+        
+        Claims are serialized with orjson and signed through PyJWT's JWS layer,
+        skipping the stdlib json pass jwt.encode would do.
+        """
+        claims["exp"] = timegm(claims["exp"].utctimetuple())
+        return api_jws.encode(orjson.dumps(claims), settings.secret_key, algorithm=settings.algorithm)
+    
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """
         Verify and decode JWT token
@@ -125,18 +174,18 @@ class SecurityManager:
             Dict[str, Any]: Token payload if valid, None otherwise
         """
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
             return payload
-        except JWTError as e:
-            logger.warning(f"Token verification failed: {e}")
+        except PyJWTError as e:
+            logger.warning("Token verification failed: %s", e)
             return None
         except Exception as e:
-            logger.error(f"Token verification error: {e}")
+            logger.error("Token verification error: %s", e)
             return None
     
     def generate_otp(self, length: int = 6) -> str:
         """
-        Generate numeric OTP
+        Generate numeric OTP from the OS CSPRNG
         
         Args:
             length: OTP length
@@ -144,7 +193,7 @@ class SecurityManager:
         Returns:
             str: Generated OTP
         """
-        return ''.join(random.choices(string.digits, k=length))
+        return f"{secrets.randbelow(10 ** length):0{length}d}"
     
     def generate_secure_token(self, length: int = 32) -> str:
         """
@@ -162,11 +211,25 @@ class SecurityManager:
 class OTPManager:
     """Handles OTP generation, storage, and verification"""
     
+    __slots__ = ("redis",)
+    
+    MAX_ATTEMPTS = 3
+    
     def __init__(self):
-        self.otp_storage = {}  # In production, use Redis or database
-        self.otp_expire_minutes = settings.admin_otp_expire_minutes
+        # OTPs live in Redis so they are shared across workers and expire server-side
+        self.redis = aioredis.Redis.from_url(settings.redis_url, decode_responses=True)
     
-    def generate_otp(self, identifier: str) -> str:
+    @staticmethod
+    def _otp_key(identifier: str) -> str:
+        """Redis key holding the OTP for identifier"""
+        return f"otp:{identifier}"
+    
+    @staticmethod
+    def _attempts_key(identifier: str) -> str:
+        """Redis key counting failed verification attempts for identifier"""
+        return f"otp:attempts:{identifier}"
+    
+    async def generate_otp(self, identifier: str) -> str:
         """
         Generate and store OTP for identifier
         
@@ -177,18 +240,17 @@ class OTPManager:
             str: Generated OTP
         """
         otp = SecurityManager().generate_otp()
-        expire_time = datetime.utcnow() + timedelta(minutes=self.otp_expire_minutes)
+        ttl_seconds = settings.admin_otp_expire_minutes * 60
         
-        self.otp_storage[identifier] = {
-            "otp": otp,
-            "expires_at": expire_time,
-            "attempts": 0
-        }
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.setex(self._otp_key(identifier), ttl_seconds, otp)
+            pipe.setex(self._attempts_key(identifier), ttl_seconds, 0)
+            await pipe.execute()
         
-        logger.info(f"OTP generated for {identifier}")
+        logger.info("OTP generated for %s", identifier)
         return otp
     
-    def verify_otp(self, identifier: str, otp: str) -> bool:
+    async def verify_otp(self, identifier: str, otp: str) -> bool:
         """
         Verify OTP for identifier
         
@@ -199,58 +261,155 @@ class OTPManager:
         Returns:
             bool: True if OTP is valid, False otherwise
         """
-        stored_otp_data = self.otp_storage.get(identifier)
+        otp_key = self._otp_key(identifier)
+        attempts_key = self._attempts_key(identifier)
         
-        if not stored_otp_data:
-            logger.warning(f"No OTP found for {identifier}")
+        # Count the attempt before comparing: INCR is atomic, so concurrent
+        # guesses cannot all slip in under the limit
+        attempts = await self.redis.incr(attempts_key)
+        if attempts > self.MAX_ATTEMPTS:
+            logger.warning("Too many OTP attempts for %s", identifier)
+            await self.redis.delete(otp_key, attempts_key)
             return False
         
-        # Check if OTP has expired
-        if datetime.utcnow() > stored_otp_data["expires_at"]:
-            logger.warning(f"OTP expired for {identifier}")
-            del self.otp_storage[identifier]
+        # Missing key covers both "never issued" and "expired" (Redis TTL)
+        stored_otp = await self.redis.get(otp_key)
+        if stored_otp is None:
+            logger.warning("No OTP found for %s", identifier)
+            await self.redis.delete(attempts_key)
             return False
         
-        # Check attempt limit
-        if stored_otp_data["attempts"] >= 3:
-            logger.warning(f"Too many OTP attempts for {identifier}")
-            del self.otp_storage[identifier]
+        # Verify OTP; GETDEL consumes it, so only one concurrent request
+        # holding the right code can succeed
+        if secrets.compare_digest(stored_otp, otp):
+            consumed_otp = await self.redis.getdel(otp_key)
+            if consumed_otp is not None and secrets.compare_digest(consumed_otp, otp):
+                logger.info("OTP verified successfully for %s", identifier)
+                await self.redis.delete(attempts_key)
+                return True
+            logger.warning("OTP for %s was already used", identifier)
             return False
         
-        # Verify OTP
-        if stored_otp_data["otp"] == otp:
-            logger.info(f"OTP verified successfully for {identifier}")
-            del self.otp_storage[identifier]
-            return True
+        if attempts == self.MAX_ATTEMPTS:
+            logger.warning("Too many OTP attempts for %s", identifier)
+            await self.redis.delete(otp_key, attempts_key)
         else:
-            stored_otp_data["attempts"] += 1
-            logger.warning(f"Invalid OTP attempt for {identifier}")
-            return False
+            logger.warning("Invalid OTP attempt for %s", identifier)
+        return False
     
-    def cleanup_expired_otps(self):
-        """Remove expired OTPs from storage"""
-        current_time = datetime.utcnow()
-        expired_keys = [
-            key for key, data in self.otp_storage.items()
-            if current_time > data["expires_at"]
-        ]
-        
-        for key in expired_keys:
-            del self.otp_storage[key]
-        
-        if expired_keys:
-            logger.info(f"Cleaned up {len(expired_keys)} expired OTPs")
+    async def close(self):
+        """Close the Redis connection pool"""
+        await self.redis.aclose()
+
+
+# Email body templates, compiled once at import
+OTP_EMAIL_TEMPLATE = Template("""
+<html>
+<body>
+    <h2>$platform_name</h2>
+    <p>Your One-Time Password (OTP) is: <strong>$otp</strong></p>
+    <p>This OTP will expire in $expire_minutes minutes.</p>
+    <p>If you didn't request this OTP, please ignore this email.</p>
+    <br>
+    <p>Best regards,<br>$platform_name Team</p>
+</body>
+</html>
+""")
+
+APPROVED_EMAIL_TEMPLATE = Template("""
+<html>
+<body>
+    <h2>$platform_name</h2>
+    <p>Dear $engineer_name,</p>
+    <p>Congratulations! Your engineer registration has been <strong>approved</strong>.</p>
+    <p>You can now access the $platform_name platform with your registered credentials.</p>
+    <p>Please log in to complete your profile and start using the platform.</p>
+    <br>
+    <p>Best regards,<br>$platform_name Team</p>
+</body>
+</html>
+""")
+
+REJECTED_EMAIL_TEMPLATE = Template("""
+<html>
+<body>
+    <h2>$platform_name</h2>
+    <p>Dear $engineer_name,</p>
+    <p>We regret to inform you that your engineer registration has been <strong>rejected</strong>.</p>
+    <p>Please contact our support team for more information or to resubmit your application.</p>
+    <br>
+    <p>Best regards,<br>$platform_name Team</p>
+</body>
+</html>
+""")
+
+
+@lru_cache(maxsize=None)
+def _bound_template(template: Template) -> Template:
+    """Fill the per-deployment placeholders of an email template once"""
+    return Template(template.safe_substitute(
+        platform_name=settings.platform_name,
+        expire_minutes=settings.admin_otp_expire_minutes
+    ))
 
 
 class EmailService:
     """Handles email sending for OTP and notifications"""
     
+    __slots__ = ("_smtp", "_lock")
+    
     def __init__(self):
-        self.smtp_host = settings.smtp_host
-        self.smtp_port = settings.smtp_port
-        self.smtp_username = settings.smtp_username
-        self.smtp_password = settings.smtp_password
-        self.smtp_use_tls = settings.smtp_use_tls
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open a new SMTP connection, upgrading to TLS and logging in"""
+        server = smtplib.SMTP(settings.smtp_host, settings.smtp_port)
+        if settings.smtp_use_tls:
+            server.starttls()
+        server.login(settings.smtp_username, settings.smtp_password)
+        return server
+    
+    def _get_connection(self) -> smtplib.SMTP:
+        """
+        Get the persistent SMTP connection, reconnecting if it has dropped
+        
+        Must be called with self._lock held.
+        """
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except smtplib.SMTPException:
+                pass
+            self._close_connection()
+        
+        self._smtp = self._connect()
+        return self._smtp
+    
+    def _close_connection(self):
+        """Close the persistent SMTP connection, ignoring errors. Call with self._lock held."""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+    
+    def _send(self, msg: EmailMessage):
+        """Send a message over the shared connection, retrying once on disconnect"""
+        with self._lock:
+            try:
+                self._get_connection().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._close_connection()
+                self._get_connection().send_message(msg)
+    
+    def close(self):
+        """Close the persistent SMTP connection"""
+        with self._lock:
+            self._close_connection()
     
     def send_otp_email(self, recipient_email: str, otp: str) -> bool:
         """
@@ -265,39 +424,24 @@ class EmailService:
         """
         try:
             # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.smtp_username
+            msg = EmailMessage()
+            msg['From'] = settings.smtp_username
             msg['To'] = recipient_email
             msg['Subject'] = f"{settings.platform_name} - Your OTP Code"
             
             # Email body
-            body = f"""
-            <html>
-            <body>
-                <h2>{settings.platform_name}</h2>
-                <p>Your One-Time Password (OTP) is: <strong>{otp}</strong></p>
-                <p>This OTP will expire in {settings.admin_otp_expire_minutes} minutes.</p>
-                <p>If you didn't request this OTP, please ignore this email.</p>
-                <br>
-                <p>Best regards,<br>{settings.platform_name} Team</p>
-            </body>
-            </html>
-            """
+            body = _bound_template(OTP_EMAIL_TEMPLATE).substitute(otp=otp)
             
-            msg.attach(MIMEText(body, 'html'))
+            msg.set_content(body, subtype='html')
             
             # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                if self.smtp_use_tls:
-                    server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
+            self._send(msg)
             
-            logger.info(f"OTP email sent successfully to {recipient_email}")
+            logger.info("OTP email sent successfully to %s", recipient_email)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send OTP email to {recipient_email}: {e}")
+            logger.error("Failed to send OTP email to %s: %s", recipient_email, e)
             return False
     
     def send_engineer_approval_email(self, recipient_email: str, engineer_name: str, status: str) -> bool:
@@ -314,61 +458,61 @@ class EmailService:
         """
         try:
             # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.smtp_username
+            msg = EmailMessage()
+            msg['From'] = settings.smtp_username
             msg['To'] = recipient_email
             msg['Subject'] = f"{settings.platform_name} - Registration {status.title()}"
             
             # Email body based on status
-            if status.lower() == "approved":
-                body = f"""
-                <html>
-                <body>
-                    <h2>{settings.platform_name}</h2>
-                    <p>Dear {engineer_name},</p>
-                    <p>Congratulations! Your engineer registration has been <strong>approved</strong>.</p>
-                    <p>You can now access the {settings.platform_name} platform with your registered credentials.</p>
-                    <p>Please log in to complete your profile and start using the platform.</p>
-                    <br>
-                    <p>Best regards,<br>{settings.platform_name} Team</p>
-                </body>
-                </html>
-                """
-            else:
-                body = f"""
-                <html>
-                <body>
-                    <h2>{settings.platform_name}</h2>
-                    <p>Dear {engineer_name},</p>
-                    <p>We regret to inform you that your engineer registration has been <strong>rejected</strong>.</p>
-                    <p>Please contact our support team for more information or to resubmit your application.</p>
-                    <br>
-                    <p>Best regards,<br>{settings.platform_name} Team</p>
-                </body>
-                </html>
-                """
+            template = APPROVED_EMAIL_TEMPLATE if status.lower() == "approved" else REJECTED_EMAIL_TEMPLATE
+            body = _bound_template(template).substitute(engineer_name=engineer_name)
             
-            msg.attach(MIMEText(body, 'html'))
+            msg.set_content(body, subtype='html')
             
             # Send email
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                if self.smtp_use_tls:
-                    server.starttls()
-                server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
+            self._send(msg)
             
-            logger.info(f"Approval email sent successfully to {recipient_email}")
+            logger.info("Approval email sent successfully to %s", recipient_email)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send approval email to {recipient_email}: {e}")
+            logger.error("Failed to send approval email to %s: %s", recipient_email, e)
             return False
 
 
-# Global instances
-security_manager = SecurityManager()
-otp_manager = OTPManager()
-email_service = EmailService()
+# Global instances, created on first use
+@lru_cache(maxsize=1)
+def get_security_manager() -> SecurityManager:
+    """Get the global SecurityManager instance"""
+    return SecurityManager()
+
+
+@lru_cache(maxsize=1)
+def get_otp_manager() -> OTPManager:
+    """Get the global OTPManager instance"""
+    return OTPManager()
+
+
+@lru_cache(maxsize=1)
+def get_email_service() -> EmailService:
+    """Get the global EmailService instance"""
+    return EmailService()
+
+
+_LAZY_GLOBALS = {
+    "security_manager": get_security_manager,
+    "otp_manager": get_otp_manager,
+    "email_service": get_email_service,
+    "pwd_context": get_pwd_context,
+}
+
+
+def __getattr__(name: str):
+    """Resolve the global instances lazily (PEP 562)"""
+    factory = _LAZY_GLOBALS.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
 
 
 def check_admin_access(email: str) -> bool:
@@ -381,11 +525,10 @@ def check_admin_access(email: str) -> bool:
     Returns:
         bool: True if admin email, False otherwise
     """
-    admin_email: str = str(settings.admin_email)  # Type hint for Pylint
-    return email.lower() == admin_email.lower()
+    return email.lower() == _admin_email_lower()
 
 
-def get_user_role(email: str, is_engineer_approved: bool = False) -> str:
+def get_user_role(email: str, is_engineer_approved: bool = False) -> UserRole:
     """
     Determine user role based on email and approval status
     
@@ -394,7 +537,7 @@ def get_user_role(email: str, is_engineer_approved: bool = False) -> str:
         is_engineer_approved: Whether engineer is approved
         
     Returns:
-        str: User role (admin, engineer, customer)
+        UserRole: User role (admin, engineer, customer)
     """
     if check_admin_access(email):
         return UserRole.ADMIN
@@ -0,0 +1,50 @@
+"""
+Upload storage helpers for POORNASREE AI Platform
+"""
+# pylint: disable=import-error,no-name-in-module
+import hashlib
+from typing import Tuple
+
+import aiofiles
+from fastapi import UploadFile
+
+# Read/write granularity for streamed uploads
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the allowed size"""
+
+
+async def save_upload(file: UploadFile, destination: str, max_size: int) -> Tuple[int, bytes]:
+    """
+    Stream an upload to disk, hashing it in the same pass
+    
+    The file is read in 1 MiB chunks; each chunk is fed to SHA-256 and
+    written out before the next is read, so the upload is never held in
+    memory whole and is not read back later just to hash it.
+    
+    Args:
+        file: Incoming upload
+        destination: Path to write to
+        max_size: Maximum allowed size in bytes
+        
+    Returns:
+        Tuple[int, bytes]: Size in bytes and raw SHA-256 digest
+        
+    Raises:
+        UploadTooLargeError: If the upload grows past max_size. The partial
+            file is left for the caller to remove.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    
+    async with aiofiles.open(destination, "wb") as out:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLargeError(f"Upload exceeds {max_size} bytes")
+            hasher.update(chunk)
+            await out.write(chunk)
+    
+    return size, hasher.digest()
@@ -1,13 +1,15 @@
 """
 Models package for POORNASREE AI Platform
 """
+import importlib
 
-# Import all models to ensure they are registered with SQLAlchemy
+# Import related models together so relationship() targets always resolve
 from .user import (
     User,
     UserSession,
     UserQuery,
     UserPreferences,
+    UserCredential,
     UserRoleEnum,
     UserStatusEnum,
     LanguageEnum
@@ -35,17 +37,28 @@ from .training import (
     training_job_documents
 )
 
-from .analytics import (
-    AnalyticsEvent,
-    UserBehaviorMetrics,
-    SystemMetrics,
-    ErrorLog,
-    PerformanceMetrics,
-    UsageStatistics,
-    FeedbackAnalytics,
-    EventTypeEnum,
-    ErrorSeverityEnum
-)
+# Analytics models have no relationships to the models above, so they are
+# imported on first access instead of with the package (PEP 562)
+_LAZY_ANALYTICS_NAMES = frozenset({
+    "AnalyticsEvent",
+    "UserBehaviorMetrics",
+    "SystemMetrics",
+    "ErrorLog",
+    "PerformanceMetrics",
+    "UsageStatistics",
+    "FeedbackAnalytics",
+    "UserQueryDaily",
+    "EventTypeEnum",
+    "ErrorSeverityEnum",
+})
+
+
+def __getattr__(name: str):
+    """Import analytics models lazily on first access"""
+    if name == "analytics" or name in _LAZY_ANALYTICS_NAMES:
+        analytics = importlib.import_module(".analytics", __name__)
+        return analytics if name == "analytics" else getattr(analytics, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     # User models
@@ -53,6 +66,7 @@ __all__ = [
     "UserSession", 
     "UserQuery",
     "UserPreferences",
+    "UserCredential",
     "UserRoleEnum",
     "UserStatusEnum",
     "LanguageEnum",
@@ -85,6 +99,7 @@ __all__ = [
     "PerformanceMetrics",
     "UsageStatistics",
     "FeedbackAnalytics",
+    "UserQueryDaily",
     "EventTypeEnum",
     "ErrorSeverityEnum",
 ]
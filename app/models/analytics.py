@@ -3,13 +3,18 @@ Analytics models for POORNASREE AI Platform
 """
 # pylint: disable=not-callable,no-member,import-error,no-name-in-module,trailing-whitespace,unused-import,wrong-import-order
 import enum
-from datetime import datetime
+import logging
+from datetime import date, datetime, timedelta
+from typing import List
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum, JSON, Float, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, Boolean, Date, DateTime, Text, Enum, JSON, Float, ForeignKey, Index, delete, event, insert, select, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
-from app.core.database import Base
+from app.core.database import Base, BIG_INTEGER_ID, BulkInsertMixin, LZ4_TABLE_OPTIONS, ReprMixin, json_key_index, json_key_text
+from app.models.user import UserQuery
+
+logger = logging.getLogger(__name__)
 
 
 class EventTypeEnum(str, enum.Enum):
@@ -36,10 +41,17 @@ class ErrorSeverityEnum(str, enum.Enum):
     CRITICAL = "critical"
 
 
-class AnalyticsEvent(Base):
-    """Analytics event model for tracking user interactions"""
+class AnalyticsEvent(BulkInsertMixin, ReprMixin, Base):
+    """
+    Analytics event model for tracking user interactions
+    
+    Indexed JSON keys (MySQL functional index): event_data->>'$.feature',
+    as CAST(event_data->>'$.feature' AS CHAR(100)) COLLATE utf8mb4_bin.
+    Filter through feature_equals() so the index applies.
+    """
     
     __tablename__ = "analytics_events"
+    __repr_fields__ = ("id", "event_type", "user_id")
     
     # Primary fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -47,8 +59,8 @@ class AnalyticsEvent(Base):
     event_name = Column(String(255), nullable=False)
     
     # User and session information
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
-    session_id = Column(String(255), nullable=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    session_id = Column(String(64), nullable=True, index=True)
     user_role = Column(String(50), nullable=True)
     
     # Event data
@@ -70,22 +82,36 @@ class AnalyticsEvent(Base):
     city = Column(String(100), nullable=True)
     
     # Device information
-    device_type = Column(String(50), nullable=True)  # desktop, mobile, tablet
+    device_type = Column(String(20), nullable=True)  # desktop, mobile, tablet
     operating_system = Column(String(100), nullable=True)
     browser = Column(String(100), nullable=True)
-    screen_resolution = Column(String(20), nullable=True)
+    screen_resolution = Column(String(16), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False, index=True)
-    
-    def __repr__(self):
-        return f"<AnalyticsEvent(id={self.id}, type='{self.event_type}', user_id={self.user_id})>"
+    created_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
+    
+    # Covers "recent events for a user": key order serves the sort and
+    # event_type rides along so the query never touches the clustered row
+    __table_args__ = (
+        Index("ix_ae_user_created", user_id, created_at.desc(), event_type),
+        LZ4_TABLE_OPTIONS,
+    )
+    
+    @classmethod
+    def feature_equals(cls, feature: str):
+        """Filter clause on event_data->>'$.feature', served by its functional index"""
+        return json_key_text(cls.event_data, "feature", 100) == feature
 
 
-class UserBehaviorMetrics(Base):
+# Functional index for equality filters on event_data->>'$.feature' (MySQL 8.0.13+)
+json_key_index(AnalyticsEvent.__table__, "ix_analytics_events_feature", "event_data", "feature", 100)
+
+
+class UserBehaviorMetrics(ReprMixin, Base):
     """User behavior metrics model for aggregated analytics"""
     
     __tablename__ = "user_behavior_metrics"
+    __repr_fields__ = ("user_id", "date", "total_queries")
     
     # Primary fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -128,17 +154,22 @@ class UserBehaviorMetrics(Base):
     error_types = Column(JSON, nullable=True)  # Error type distribution
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
-    
-    def __repr__(self):
-        return f"<UserBehaviorMetrics(user_id={self.user_id}, date={self.date}, queries={self.total_queries})>"
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
 
 
-class SystemMetrics(Base):
-    """System metrics model for monitoring platform performance"""
+class SystemMetrics(BulkInsertMixin, ReprMixin, Base):
+    """
+    System metrics model for monitoring platform performance
+    
+    On MySQL the table is range-partitioned by month on timestamp, so
+    time-window queries prune to the months they touch. The current and next
+    months get partitions at create time; ensure_month_partitions, run from
+    the scheduled maintenance job, keeps splitting new months out of p_future.
+    """
     
     __tablename__ = "system_metrics"
+    __repr_fields__ = ("metric_name", "metric_value", "timestamp")
     
     # Primary fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -156,37 +187,118 @@ class SystemMetrics(Base):
     environment = Column(String(50), nullable=True)  # dev, staging, prod
     
     # Timestamps
-    timestamp = Column(DateTime, default=func.now(), nullable=False, index=True)
-    
-    def __repr__(self):
-        return f"<SystemMetrics(name='{self.metric_name}', value={self.metric_value}, timestamp={self.timestamp})>"
+    timestamp = Column(DateTime, server_default=func.now(), nullable=False, index=True)
+    
+    @classmethod
+    def ensure_month_partitions(cls, session, through: date) -> List[str]:
+        """
+        Split monthly partitions out of p_future up to the month of through (MySQL only)
+        
+        Months are added in order after the newest existing one, so p_future
+        only ever gives up rows of the month being split off. Old months can
+        be archived with ALTER TABLE ... DROP PARTITION. A table created
+        before partitioning was introduced has no p_future to split and is
+        left alone until it is migrated.
+        
+        Returns:
+            List[str]: Names of the partitions added
+        """
+        if session.get_bind().dialect.name != "mysql":
+            return []
+        
+        # A non-partitioned table has a single row with a NULL PARTITION_NAME
+        partitions = session.execute(text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+        ), {"table": cls.__tablename__}).scalars().all()
+        if "p_future" not in partitions:
+            logger.warning(
+                "%s is not partitioned by month; skipping partition maintenance", cls.__tablename__
+            )
+            return []
+        
+        monthly = [name for name in partitions if name and name != "p_future"]
+        if monthly:
+            newest = max(monthly)
+            month = _next_month(date(int(newest[1:5]), int(newest[5:7]), 1))
+        else:
+            oldest = session.execute(select(func.min(cls.timestamp))).scalar()
+            month = (oldest.date() if oldest else through).replace(day=1)
+        
+        added = []
+        while month <= through.replace(day=1):
+            session.execute(text(
+                f"ALTER TABLE {cls.__tablename__} REORGANIZE PARTITION p_future INTO ("
+                f"{_month_partition(month)}, PARTITION p_future VALUES LESS THAN MAXVALUE)"
+            ))
+            added.append(f"p{month:%Y%m}")
+            month = _next_month(month)
+        return added
+
+
+def _next_month(month_start: date) -> date:
+    """First day of the month after month_start"""
+    return (month_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _month_partition(month_start: date) -> str:
+    """Partition definition holding one month of system_metrics rows"""
+    return (
+        f"PARTITION p{month_start:%Y%m} "
+        f"VALUES LESS THAN (TO_DAYS('{_next_month(month_start):%Y-%m-%d}'))"
+    )
+
+
+def _partition_system_metrics(target, connection, **kw):
+    """Re-key system_metrics on (id, timestamp) and partition it by month"""
+    if connection.dialect.name != "mysql":
+        return
+    current = datetime.utcnow().date().replace(day=1)
+    connection.execute(text(
+        "ALTER TABLE system_metrics DROP PRIMARY KEY, ADD PRIMARY KEY (id, timestamp) "
+        "PARTITION BY RANGE (TO_DAYS(timestamp)) ("
+        f"{_month_partition(current)}, {_month_partition(_next_month(current))}, "
+        "PARTITION p_future VALUES LESS THAN MAXVALUE)"
+    ))
+
 
+# MySQL requires the partition key in the primary key, so the table is
+# re-keyed on (id, timestamp) and partitioned right after it is created
+event.listen(SystemMetrics.__table__, "after_create", _partition_system_metrics)
 
-class ErrorLog(Base):
-    """Error log model for tracking system errors"""
+
+class ErrorLog(BulkInsertMixin, ReprMixin, Base):
+    """
+    Error log model for tracking system errors
+    
+    Indexed JSON keys (MySQL functional index): request_data->>'$.path',
+    as CAST(request_data->>'$.path' AS CHAR(255)) COLLATE utf8mb4_bin.
+    Filter through request_path_equals() so the index applies.
+    """
     
     __tablename__ = "error_logs"
+    __repr_fields__ = ("id", "error_type", "severity")
     
     # Primary fields
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    error_code = Column(String(100), nullable=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    error_code = Column(String(100), nullable=True)
     error_message = Column(Text, nullable=False)
     
     # Error details
     error_type = Column(String(255), nullable=False)
-    severity = Column(Enum(ErrorSeverityEnum), nullable=False, index=True)
+    severity = Column(Enum(ErrorSeverityEnum), nullable=False)
     stack_trace = Column(Text, nullable=True)
     
     # Context information
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
-    session_id = Column(String(255), nullable=True, index=True)
-    request_id = Column(String(255), nullable=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    session_id = Column(String(64), nullable=True)
+    request_id = Column(String(64), nullable=True, index=True)
     
     # Request details
     endpoint = Column(String(500), nullable=True)
     method = Column(String(10), nullable=True)
     request_data = Column(JSON, nullable=True)
-    response_status = Column(Integer, nullable=True)
+    response_status = Column(SmallInteger, nullable=True)
     
     # System information
     service_name = Column(String(255), nullable=True)
@@ -205,26 +317,41 @@ class ErrorLog(Base):
     resolved_at = Column(DateTime, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False, index=True)
-    
-    def __repr__(self):
-        return f"<ErrorLog(id={self.id}, type='{self.error_type}', severity='{self.severity}')>"
+    created_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
+    
+    __table_args__ = (
+        Index("ix_error_logs_user_created", user_id, created_at.desc(), severity),
+        # Unresolved errors are a tiny, contiguous slice at the front of this
+        # index; severity-only filters use it through a skip scan
+        Index("ix_error_logs_unresolved", is_resolved, severity, created_at),
+        LZ4_TABLE_OPTIONS,
+    )
+    
+    @classmethod
+    def request_path_equals(cls, path: str):
+        """Filter clause on request_data->>'$.path', served by its functional index"""
+        return json_key_text(cls.request_data, "path", 255) == path
+
 
+# Functional index for equality filters on request_data->>'$.path' (MySQL 8.0.13+)
+json_key_index(ErrorLog.__table__, "ix_error_logs_request_path", "request_data", "path", 255)
 
-class PerformanceMetrics(Base):
+
+class PerformanceMetrics(BulkInsertMixin, ReprMixin, Base):
     """Performance metrics model for monitoring API and system performance"""
     
     __tablename__ = "performance_metrics"
+    __repr_fields__ = ("endpoint", "response_time_ms")
     
     # Primary fields
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    endpoint = Column(String(500), nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    endpoint = Column(String(500), nullable=False)
     method = Column(String(10), nullable=False)
     
     # Request information
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
-    session_id = Column(String(255), nullable=True)
-    request_id = Column(String(255), nullable=True, index=True)
+    session_id = Column(String(64), nullable=True)
+    request_id = Column(String(64), nullable=True, index=True)
     
     # Performance metrics
     response_time_ms = Column(Integer, nullable=False)
@@ -233,7 +360,7 @@ class PerformanceMetrics(Base):
     external_api_time_ms = Column(Integer, nullable=True)
     
     # Response information
-    status_code = Column(Integer, nullable=False)
+    status_code = Column(SmallInteger, nullable=False)
     response_size_bytes = Column(Integer, nullable=True)
     
     # Resource usage
@@ -245,16 +372,19 @@ class PerformanceMetrics(Base):
     cache_key = Column(String(255), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False, index=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
     
-    def __repr__(self):
-        return f"<PerformanceMetrics(endpoint='{self.endpoint}', response_time={self.response_time_ms}ms)>"
+    __table_args__ = (
+        Index("ix_perf_endpoint_created", endpoint, created_at.desc(), response_time_ms, status_code),
+        Index("ix_perf_status_created", status_code, created_at),
+    )
 
 
-class UsageStatistics(Base):
+class UsageStatistics(ReprMixin, Base):
     """Usage statistics model for business intelligence"""
     
     __tablename__ = "usage_statistics"
+    __repr_fields__ = ("date", "period_type", "active_users")
     
     # Primary fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -308,27 +438,25 @@ class UsageStatistics(Base):
     support_resolution_rate = Column(Float, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
-    
-    def __repr__(self):
-        return f"<UsageStatistics(date={self.date}, period='{self.period_type}', active_users={self.active_users})>"
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
 
 
-class FeedbackAnalytics(Base):
+class FeedbackAnalytics(ReprMixin, Base):
     """Feedback analytics model for user satisfaction tracking"""
     
     __tablename__ = "feedback_analytics"
+    __repr_fields__ = ("id", "feedback_type", "rating")
     
     # Primary fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     session_id = Column(String(255), nullable=True)
-    query_id = Column(Integer, ForeignKey("user_queries.id"), nullable=True, index=True)  # Reference to UserQuery
+    query_id = Column(BIG_INTEGER_ID, ForeignKey("user_queries.id"), nullable=True, index=True)  # Reference to UserQuery
     
     # Feedback information
     feedback_type = Column(String(100), nullable=False)  # rating, comment, bug_report
-    rating = Column(Integer, nullable=True)  # 1-5 star rating
+    rating = Column(SmallInteger, nullable=True)  # 1-5 star rating
     feedback_text = Column(Text, nullable=True)
     
     # Context information
@@ -348,7 +476,51 @@ class FeedbackAnalytics(Base):
     responded_at = Column(DateTime, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False, index=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False, index=True)
+
+
+class UserQueryDaily(ReprMixin, Base):
+    """
+    Daily roll-up of user_queries per knowledge base tier
     
-    def __repr__(self):
-        return f"<FeedbackAnalytics(id={self.id}, type='{self.feedback_type}', rating={self.rating})>"
+    Dashboards read this table instead of aggregating user_queries at request
+    time; refresh() recomputes recent days in place.
+    """
+    
+    __tablename__ = "user_query_daily"
+    __repr_fields__ = ("day", "knowledge_base_tier", "query_count")
+    
+    day = Column(Date, primary_key=True)
+    knowledge_base_tier = Column(Integer, primary_key=True)
+    query_count = Column(Integer, default=0, nullable=False)
+    avg_processing_time_ms = Column(Float, nullable=True)
+    avg_satisfaction_rating = Column(Float, nullable=True)
+    refreshed_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    @classmethod
+    def refresh(cls, session, since: date) -> None:
+        """
+        Recompute the roll-up rows for every day from since onwards
+        
+        Replaces those rows with one INSERT ... SELECT aggregate, which uses
+        the created_at index on user_queries. The caller commits.
+        """
+        day = func.date(UserQuery.created_at)
+        aggregate = (
+            select(
+                day,
+                UserQuery.knowledge_base_tier,
+                func.count(UserQuery.id),
+                func.avg(UserQuery.processing_time_ms),
+                func.avg(UserQuery.satisfaction_rating)
+            )
+            .where(UserQuery.created_at >= since)
+            .group_by(day, UserQuery.knowledge_base_tier)
+        )
+        session.execute(delete(cls).where(cls.day >= since))
+        session.execute(
+            insert(cls).from_select(
+                ["day", "knowledge_base_tier", "query_count", "avg_processing_time_ms", "avg_satisfaction_rating"],
+                aggregate
+            )
+        )
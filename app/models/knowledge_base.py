@@ -4,12 +4,14 @@ Knowledge base models for POORNASREE AI Platform
 # pylint: disable=not-callable,no-member,import-error,no-name-in-module,trailing-whitespace,unused-import,wrong-import-order
 import enum
 from datetime import datetime
+from typing import List
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum, JSON, Float, LargeBinary, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, Boolean, DateTime, Text, Enum, JSON, Float, LargeBinary, ForeignKey, BINARY, DDL, Index, event, insert, update
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.orm import relationship, validates
 
-from app.core.database import Base
+from app.core.database import Base, BulkInsertMixin, LAZY_COLLECTION, LZ4_TABLE_OPTIONS, ReprMixin, json_key_index, json_key_text
 
 
 class DocumentTypeEnum(str, enum.Enum):
@@ -39,6 +41,28 @@ class KnowledgeBaseTierEnum(int, enum.Enum):
     ADMIN = 3
 
 
+class KnowledgeBaseTierType(TypeDecorator):
+    """
+    Stores KnowledgeBaseTierEnum as its numeric value in a SMALLINT
+    
+    Tier filters such as knowledge_base_tier <= 2 then compare plain
+    integers, and rows load back as KnowledgeBaseTierEnum members.
+    """
+    
+    impl = SmallInteger
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        return None if value is None else int(value)
+    
+    def process_result_value(self, value, dialect):
+        return None if value is None else KnowledgeBaseTierEnum(value)
+
+
+# Longest tag or keyword the CHAR(n) ARRAY multi-valued indexes accept
+MAX_TAG_LENGTH = 100
+
+
 class LanguageEnum(str, enum.Enum):
     """Language enumeration"""
     ENGLISH = "en"
@@ -46,10 +70,18 @@ class LanguageEnum(str, enum.Enum):
     MIXED = "mixed"
 
 
-class Document(Base):
-    """Document model for knowledge base storage"""
+class Document(ReprMixin, Base):
+    """
+    Document model for knowledge base storage
+    
+    Link documents to a training job with attach_to_training_job, which
+    writes every junction row in one statement, rather than appending to
+    job.documents in a loop.
+    """
     
     __tablename__ = "documents"
+    __repr_fields__ = ("id", "title", "knowledge_base_tier")
+    __table_args__ = LZ4_TABLE_OPTIONS
     
     # Primary fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -63,7 +95,7 @@ class Document(Base):
     file_size = Column(Integer, nullable=False)  # Size in bytes
     file_type = Column(Enum(DocumentTypeEnum), nullable=False)
     mime_type = Column(String(255), nullable=False)
-    file_hash = Column(String(64), nullable=False, index=True)  # SHA-256 hash
+    file_hash = Column(BINARY(32), nullable=False, index=True)  # Raw SHA-256 digest
     
     # Content information
     extracted_text = Column(Text, nullable=True)
@@ -72,7 +104,7 @@ class Document(Base):
     page_count = Column(Integer, nullable=True)
     
     # Knowledge base classification
-    knowledge_base_tier = Column(Enum(KnowledgeBaseTierEnum), nullable=False)
+    knowledge_base_tier = Column(KnowledgeBaseTierType, nullable=False)
     category = Column(String(255), nullable=True)
     tags = Column(JSON, nullable=True)  # Array of tags
     keywords = Column(JSON, nullable=True)  # Extracted keywords
@@ -97,52 +129,85 @@ class Document(Base):
     access_permissions = Column(JSON, nullable=True)  # User/role permissions
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     processed_at = Column(DateTime, nullable=True)
     last_accessed_at = Column(DateTime, nullable=True)
     
     # Relationships
     chunks = relationship("DocumentChunk", back_populates="document", cascade="all, delete-orphan")
-    training_jobs = relationship("TrainingJob", secondary="training_job_documents", back_populates="documents")
-    
-    def __repr__(self):
-        return f"<Document(id={self.id}, title='{self.title}', tier={self.knowledge_base_tier})>"
+    training_jobs = relationship("TrainingJob", secondary="training_job_documents", back_populates="documents", lazy=LAZY_COLLECTION)
+    
+    @validates("tags", "keywords")
+    def validate_tag_lengths(self, key, values):
+        """Reject entries the multi-valued index on tags/keywords would refuse"""
+        if values and any(len(str(value)) > MAX_TAG_LENGTH for value in values):
+            raise ValueError(f"Document {key} must be at most {MAX_TAG_LENGTH} characters each")
+        return values
+    
+    @staticmethod
+    def attach_to_training_job(session, job_id: int, document_ids: List[int]) -> None:
+        """
+        Link documents to a training job with a single multi-row INSERT
+        
+        Pairs that are already linked are skipped. The caller commits.
+        """
+        if not document_ids:
+            return
+        
+        junction = Base.metadata.tables["training_job_documents"]
+        stmt = (
+            insert(junction)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite")
+            .values([
+                {"training_job_id": job_id, "document_id": document_id}
+                for document_id in dict.fromkeys(document_ids)
+            ])
+        )
+        session.execute(stmt)
+    
+    _SCALAR_FIELDS = (
+        "id", "title", "description", "filename", "original_filename", "file_size",
+        "mime_type", "word_count", "page_count", "category", "tags", "keywords",
+        "is_vectorized", "vector_count", "version", "uploaded_by", "is_public",
+    )
+    _ENUM_FIELDS = ("file_type", "language", "knowledge_base_tier", "status")
+    _DT_FIELDS = ("created_at", "updated_at", "processed_at")
     
     def to_dict(self):
         """Convert document to dictionary"""
-        return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "filename": self.filename,
-            "original_filename": self.original_filename,
-            "file_size": self.file_size,
-            "file_type": self.file_type.value if self.file_type else None,
-            "mime_type": self.mime_type,
-            "language": self.language.value if self.language else None,
-            "word_count": self.word_count,
-            "page_count": self.page_count,
-            "knowledge_base_tier": self.knowledge_base_tier.value if self.knowledge_base_tier else None,
-            "category": self.category,
-            "tags": self.tags,
-            "keywords": self.keywords,
-            "status": self.status.value if self.status else None,
-            "is_vectorized": self.is_vectorized,
-            "vector_count": self.vector_count,
-            "version": self.version,
-            "uploaded_by": self.uploaded_by,
-            "is_public": self.is_public,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "processed_at": self.processed_at.isoformat() if self.processed_at else None,
-        }
+        data = {name: getattr(self, name) for name in self._SCALAR_FIELDS}
+        for name in self._ENUM_FIELDS:
+            value = getattr(self, name)
+            data[name] = value.value if value is not None else None
+        for name in self._DT_FIELDS:
+            value = getattr(self, name)
+            data[name] = value.isoformat() if value is not None else None
+        file_hash = self.file_hash
+        data["file_hash"] = file_hash.hex() if file_hash else None
+        return data
+
 
+# Multi-valued indexes over the JSON tag/keyword arrays, so JSON_OVERLAPS,
+# JSON_CONTAINS and MEMBER OF filters use an index (MySQL 8.0.17+ only)
+for _column in ("tags", "keywords"):
+    event.listen(
+        Document.__table__,
+        "after_create",
+        DDL(
+            f"CREATE INDEX ix_documents_{_column}_mv ON documents "
+            f"((CAST({_column} AS CHAR({MAX_TAG_LENGTH}) ARRAY)))"
+        ).execute_if(dialect="mysql")
+    )
 
-class DocumentChunk(Base):
+
+class DocumentChunk(ReprMixin, Base):
     """Document chunk model for vector storage"""
     
     __tablename__ = "document_chunks"
+    __repr_fields__ = ("id", "document_id", "chunk_index")
+    __table_args__ = LZ4_TABLE_OPTIONS
     
     # Primary fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -172,24 +237,22 @@ class DocumentChunk(Base):
     relevance_score = Column(Float, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
     document = relationship("Document", back_populates="chunks")
-    
-    def __repr__(self):
-        return f"<DocumentChunk(id={self.id}, document_id={self.document_id}, chunk_index={self.chunk_index})>"
 
 
-class KnowledgeBaseStats(Base):
+class KnowledgeBaseStats(ReprMixin, Base):
     """Knowledge base statistics model"""
     
     __tablename__ = "knowledge_base_stats"
+    __repr_fields__ = ("knowledge_base_tier", "total_documents")
     
     # Primary fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    knowledge_base_tier = Column(Enum(KnowledgeBaseTierEnum), nullable=False, index=True)
+    knowledge_base_tier = Column(KnowledgeBaseTierType, nullable=False, index=True)
     
     # Document statistics
     total_documents = Column(Integer, default=0, nullable=False)
@@ -219,18 +282,51 @@ class KnowledgeBaseStats(Base):
     average_response_time = Column(Float, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
-    stats_date = Column(DateTime, default=func.now(), nullable=False)
-    
-    def __repr__(self):
-        return f"<KnowledgeBaseStats(tier={self.knowledge_base_tier}, total_docs={self.total_documents})>"
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    stats_date = Column(DateTime, server_default=func.now(), nullable=False)
+    
+    @classmethod
+    def record_document(cls, session, document: "Document") -> None:
+        """
+        Fold a newly added document into its tier's counters
+        
+        Runs as one in-place UPDATE in the caller's transaction, so the stats
+        stay current on write instead of being recomputed from the documents
+        table. The caller commits.
+        """
+        values = {
+            cls.total_documents: cls.total_documents + 1,
+            cls.total_size_bytes: cls.total_size_bytes + (document.file_size or 0),
+        }
+        type_column = _TYPE_COUNT_COLUMNS.get(document.file_type)
+        if type_column is not None:
+            column = getattr(cls, type_column)
+            values[column] = column + 1
+        
+        session.execute(
+            update(cls)
+            .where(cls.knowledge_base_tier == document.knowledge_base_tier)
+            .values(values)
+        )
+
+
+# KnowledgeBaseStats counter column for each document type
+_TYPE_COUNT_COLUMNS = {
+    DocumentTypeEnum.PDF: "pdf_count",
+    DocumentTypeEnum.DOC: "doc_count",
+    DocumentTypeEnum.DOCX: "doc_count",
+    DocumentTypeEnum.TXT: "txt_count",
+    DocumentTypeEnum.IMAGE: "image_count",
+    DocumentTypeEnum.AUDIO: "audio_count",
+}
 
 
-class DocumentCategory(Base):
+class DocumentCategory(ReprMixin, Base):
     """Document category model for organization"""
     
     __tablename__ = "document_categories"
+    __repr_fields__ = ("id", "name", "level")
     
     # Primary fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -255,22 +351,27 @@ class DocumentCategory(Base):
     document_count = Column(Integer, default=0, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
-    
-    def __repr__(self):
-        return f"<DocumentCategory(id={self.id}, name='{self.name}', level={self.level})>"
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
 
 
-class SearchQuery(Base):
-    """Search query model for analytics and optimization"""
+class SearchQuery(BulkInsertMixin, ReprMixin, Base):
+    """
+    Search query model for analytics and optimization
+    
+    Indexed JSON keys (MySQL functional index, after query_intent):
+    search_scope->>'$.category', as
+    CAST(search_scope->>'$.category' AS CHAR(255)) COLLATE utf8mb4_bin.
+    Filter through scope_category_equals() so the index applies.
+    """
     
     __tablename__ = "search_queries"
+    __repr_fields__ = ("id", "knowledge_base_tier", "results_count")
     
     # Primary fields
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
-    session_id = Column(String(255), nullable=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    session_id = Column(String(64), nullable=True, index=True)
     
     # Query information
     query_text = Column(Text, nullable=False)
@@ -279,7 +380,7 @@ class SearchQuery(Base):
     query_intent = Column(String(255), nullable=True)  # Detected intent
     
     # Search parameters
-    knowledge_base_tier = Column(Enum(KnowledgeBaseTierEnum), nullable=False)
+    knowledge_base_tier = Column(KnowledgeBaseTierType, nullable=False)
     search_filters = Column(JSON, nullable=True)  # Applied filters
     search_scope = Column(JSON, nullable=True)  # Categories, tags, etc.
     
@@ -295,7 +396,7 @@ class SearchQuery(Base):
     
     # User interaction
     clicked_results = Column(JSON, nullable=True)  # Which results were clicked
-    user_satisfaction = Column(Integer, nullable=True)  # 1-5 rating
+    user_satisfaction = Column(SmallInteger, nullable=True)  # 1-5 rating
     user_feedback = Column(Text, nullable=True)
     
     # Analytics
@@ -304,7 +405,24 @@ class SearchQuery(Base):
     referer = Column(String(1000), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    
-    def __repr__(self):
-        return f"<SearchQuery(id={self.id}, tier={self.knowledge_base_tier}, results={self.results_count})>"
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    
+    # Covers "recent searches for a user" without a second lookup for the tier
+    __table_args__ = (
+        Index("ix_search_queries_user_created", user_id, created_at.desc(), knowledge_base_tier),
+        # NULLs (unrated searches) sort first, so IS NOT NULL is a single range
+        Index("ix_search_queries_satisfaction", user_satisfaction, created_at),
+        LZ4_TABLE_OPTIONS,
+    )
+    
+    @classmethod
+    def scope_category_equals(cls, category: str):
+        """Filter clause on search_scope->>'$.category', served by its functional index"""
+        return json_key_text(cls.search_scope, "category", 255) == category
+
+
+# Composite functional index for query_intent + search_scope->>'$.category' (MySQL 8.0.13+)
+json_key_index(
+    SearchQuery.__table__, "ix_search_queries_intent_category",
+    "search_scope", "category", 255, "query_intent"
+)
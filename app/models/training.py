@@ -4,12 +4,13 @@ Training models for POORNASREE AI Platform
 # pylint: disable=not-callable,no-member,import-error,no-name-in-module,trailing-whitespace,unused-import,wrong-import-order
 import enum
 from datetime import datetime
+from typing import Any, Dict, List
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum, JSON, Float, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum, JSON, Float, Table, ForeignKey, Index, DDL, FetchedValue, event, select
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, selectinload
 
-from app.core.database import Base
+from app.core.database import Base, BulkInsertMixin, LAZY_COLLECTION, LZ4_TABLE_OPTIONS, maintain_updated_at
 
 
 class TrainingStatusEnum(str, enum.Enum):
@@ -42,8 +43,10 @@ class ModelTypeEnum(str, enum.Enum):
 training_job_documents = Table(
     'training_job_documents',
     Base.metadata,
-    Column('training_job_id', Integer, ForeignKey('training_jobs.id'), nullable=False),
-    Column('document_id', Integer, ForeignKey('documents.id'), nullable=False)
+    Column('training_job_id', Integer, ForeignKey('training_jobs.id'), primary_key=True),
+    Column('document_id', Integer, ForeignKey('documents.id'), primary_key=True),
+    # Reverse lookups (document.training_jobs) can't use the (job, document) primary key
+    Index('ix_training_job_documents_doc', 'document_id', 'training_job_id')
 )
 
 
@@ -101,44 +104,105 @@ class TrainingJob(Base):
     created_by = Column(String(255), nullable=False)  # User email
     approved_by = Column(String(255), nullable=True)  # For enterprise approval workflows
     
+    # Denormalized counters, maintained by triggers on training_job_documents and model_versions
+    documents_count = Column(Integer, nullable=False, server_default="0")
+    model_versions_count = Column(Integer, nullable=False, server_default="0")
+    
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), server_onupdate=FetchedValue(), nullable=False)
     
     # Relationships
-    documents = relationship("Document", secondary=training_job_documents, back_populates="training_jobs")
+    documents = relationship("Document", secondary=training_job_documents, back_populates="training_jobs", lazy=LAZY_COLLECTION)
+    # Plain lazy loads; views that serialize children use query_with_all()
     model_versions = relationship("ModelVersion", back_populates="training_job", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # Keyset pagination for the non-admin "my jobs" listing
+        Index("ix_jobs_created_by_id", "created_by", "id"),
+        # Status filters, alone and per user, ordered by the id DESC keyset
+        # (id < before_id) the listing pages with, so MySQL never filesorts
+        Index("ix_training_jobs_status_id", "status", "id"),
+        Index("ix_training_jobs_created_by_status_id", "created_by", "status", "id"),
+    )
+    
     def __repr__(self):
         return f"<TrainingJob(id={self.id}, name='{self.name}', status='{self.status}')>"
     
+    # Columns behind TrainingJobResponse, selected directly by list_dicts
+    _LIST_FIELDS = (
+        "id", "name", "description", "training_type", "model_type", "knowledge_base_tier",
+        "status", "progress_percentage", "current_step", "total_steps", "final_score",
+        "estimated_duration_minutes", "actual_duration_minutes", "error_message",
+        "documents_count", "model_versions_count",
+        "created_by", "created_at", "started_at", "completed_at",
+    )
+    
+    @classmethod
+    def list_dicts(cls, session, *criteria, order_by=None, offset: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Select listing columns as plain dicts, without building ORM instances
+        
+        Enum columns come back as str-enum members, which orjson encodes by value.
+        """
+        stmt = select(*(getattr(cls, name) for name in cls._LIST_FIELDS)).where(*criteria)
+        if order_by is not None:
+            stmt = stmt.order_by(order_by)
+        stmt = stmt.offset(offset).limit(limit)
+        return [dict(row) for row in session.execute(stmt).mappings()]
+    
+    @classmethod
+    def query_with_all(cls):
+        """Select jobs with documents, model versions and their evaluations loaded in one IN query each"""
+        return select(cls).options(
+            selectinload(cls.documents),
+            selectinload(cls.model_versions).selectinload(ModelVersion.evaluations)
+        )
+    
+    _SCALAR_FIELDS = (
+        "id", "name", "description", "knowledge_base_tier", "progress_percentage",
+        "current_step", "total_steps", "final_score", "estimated_duration_minutes",
+        "actual_duration_minutes", "error_message", "retry_count", "max_retries",
+        "documents_count", "model_versions_count", "created_by",
+    )
+    _ENUM_FIELDS = ("training_type", "model_type", "status")
+    _DT_FIELDS = ("created_at", "started_at", "completed_at", "updated_at")
+    
     def to_dict(self):
         """Convert training job to dictionary"""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "training_type": self.training_type.value if self.training_type else None,
-            "model_type": self.model_type.value if self.model_type else None,
-            "knowledge_base_tier": self.knowledge_base_tier,
-            "status": self.status.value if self.status else None,
-            "progress_percentage": self.progress_percentage,
-            "current_step": self.current_step,
-            "total_steps": self.total_steps,
-            "final_score": self.final_score,
-            "estimated_duration_minutes": self.estimated_duration_minutes,
-            "actual_duration_minutes": self.actual_duration_minutes,
-            "error_message": self.error_message,
-            "retry_count": self.retry_count,
-            "max_retries": self.max_retries,
-            "created_by": self.created_by,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
+        data = {name: getattr(self, name) for name in self._SCALAR_FIELDS}
+        for name in self._ENUM_FIELDS:
+            value = getattr(self, name)
+            data[name] = value.value if value is not None else None
+        for name in self._DT_FIELDS:
+            value = getattr(self, name)
+            data[name] = value.isoformat() if value is not None else None
+        return data
+
+
+# Keep TrainingJob.documents_count and model_versions_count in step with their
+# child rows. INSERT IGNORE skips AFTER INSERT triggers for duplicate links,
+# so attach_to_training_job never double-counts.
+def _counter_triggers(table: str, counter: str):
+    """DDL for AFTER INSERT/DELETE triggers that maintain training_jobs.<counter>"""
+    return [
+        DDL(
+            f"CREATE TRIGGER trg_{table}_ai AFTER INSERT ON {table} FOR EACH ROW "
+            f"UPDATE training_jobs SET {counter} = {counter} + 1 WHERE id = NEW.training_job_id"
+        ).execute_if(dialect="mysql"),
+        DDL(
+            f"CREATE TRIGGER trg_{table}_ad AFTER DELETE ON {table} FOR EACH ROW "
+            f"UPDATE training_jobs SET {counter} = {counter} - 1 WHERE id = OLD.training_job_id"
+        ).execute_if(dialect="mysql"),
+    ]
+
+
+for _ddl in _counter_triggers("training_job_documents", "documents_count"):
+    event.listen(training_job_documents, "after_create", _ddl)
+
+maintain_updated_at(TrainingJob.__table__)
 
 
 class ModelVersion(Base):
@@ -157,7 +221,7 @@ class ModelVersion(Base):
     
     # Model information
     model_type = Column(Enum(ModelTypeEnum), nullable=False)
-    knowledge_base_tier = Column(Integer, nullable=False)
+    knowledge_base_tier = Column(Integer, nullable=False, index=True)
     model_size_mb = Column(Float, nullable=True)
     
     # Performance metrics
@@ -188,7 +252,7 @@ class ModelVersion(Base):
     is_archived = Column(Boolean, default=False, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
     deployed_at = Column(DateTime, nullable=True)
     archived_at = Column(DateTime, nullable=True)
     
@@ -196,14 +260,24 @@ class ModelVersion(Base):
     training_job = relationship("TrainingJob", back_populates="model_versions")
     evaluations = relationship("ModelEvaluation", foreign_keys="[ModelEvaluation.model_version_id]", back_populates="model_version", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # Lookup of the deployed, active model for a tier
+        Index("ix_model_versions_deployed_tier", "is_deployed", "is_active", "knowledge_base_tier"),
+    )
+    
     def __repr__(self):
         return f"<ModelVersion(id={self.id}, version='{self.version_number}', deployed={self.is_deployed})>"
 
 
+for _ddl in _counter_triggers("model_versions", "model_versions_count"):
+    event.listen(ModelVersion.__table__, "after_create", _ddl)
+
+
 class ModelEvaluation(Base):
     """Model evaluation model for A/B testing and performance tracking"""
     
     __tablename__ = "model_evaluations"
+    __table_args__ = LZ4_TABLE_OPTIONS
     
     # Primary fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -238,7 +312,7 @@ class ModelEvaluation(Base):
     reviewed_by = Column(String(255), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     reviewed_at = Column(DateTime, nullable=True)
@@ -250,10 +324,11 @@ class ModelEvaluation(Base):
         return f"<ModelEvaluation(id={self.id}, name='{self.evaluation_name}', status='{self.status}')>"
 
 
-class DatasetVersion(Base):
+class DatasetVersion(BulkInsertMixin, Base):
     """Dataset version model for tracking training datasets"""
     
     __tablename__ = "dataset_versions"
+    __table_args__ = LZ4_TABLE_OPTIONS
     
     # Primary fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -295,7 +370,7 @@ class DatasetVersion(Base):
     validated_by = Column(String(255), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
     validated_at = Column(DateTime, nullable=True)
     
     def __repr__(self):
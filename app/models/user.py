@@ -3,13 +3,16 @@ User models for POORNASREE AI Platform
 """
 # pylint: disable=not-callable,no-member,import-error,no-name-in-module,trailing-whitespace,unused-import,wrong-import-order
 import enum
+import hashlib
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum, JSON, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, String, Boolean, DateTime, Text, Enum, JSON, ForeignKey, Index, BINARY, FetchedValue
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.orm import relationship, validates
 
-from app.core.database import Base
+from app.core.database import Base, BIG_INTEGER_ID, BulkInsertMixin, LAZY_COLLECTION, LZ4_TABLE_OPTIONS, maintain_updated_at
 
 
 class UserRoleEnum(str, enum.Enum):
@@ -34,21 +37,48 @@ class LanguageEnum(str, enum.Enum):
     HINDI = "hi"
 
 
+class TokenHash(TypeDecorator):
+    """
+    Stores a token as its 32-byte SHA-256 digest
+    
+    Bound values are hashed, so equality filters take the raw token and probe
+    the index with its digest; loaded values are the digest bytes.
+    """
+    
+    impl = BINARY(32)
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        return hashlib.sha256(value.encode("utf-8")).digest()
+
+
+def hash_email(email: str) -> bytes:
+    """16-byte truncated SHA-256 of a trimmed, lower-cased email; the users lookup key"""
+    return hashlib.sha256(email.strip().lower().encode("utf-8")).digest()[:16]
+
+
 class User(Base):
-    """User model for authentication and profile management"""
+    """
+    User model for authentication and profile management
+    
+    Emails are unique and looked up through email_hash, a fixed-width key
+    kept in step with email; filter with User.with_email(email).
+    """
     
     __tablename__ = "users"
     
     # Primary fields
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    email = Column(String(255), unique=True, index=True, nullable=False)
+    email = Column(String(255), nullable=False)
+    email_hash = Column(BINARY(16), unique=True, nullable=False)
     full_name = Column(String(255), nullable=False)
     phone_number = Column(String(20), nullable=True)
     role = Column(Enum(UserRoleEnum), default=UserRoleEnum.CUSTOMER, nullable=False)
     status = Column(Enum(UserStatusEnum), default=UserStatusEnum.ACTIVE, nullable=False)
     
-    # Authentication fields
-    hashed_password = Column(String(255), nullable=True)  # Nullable for OTP-only admin access
+    # Authentication fields (the password hash lives in UserCredential)
     is_active = Column(Boolean, default=True, nullable=False)
     is_verified = Column(Boolean, default=False, nullable=False)
     
@@ -74,45 +104,51 @@ class User(Base):
     approved_at = Column(DateTime, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), server_onupdate=FetchedValue(), nullable=False)
     last_login_at = Column(DateTime, nullable=True)
     
     # Relationships
-    sessions = relationship("UserSession", back_populates="user", cascade="all, delete-orphan")
-    queries = relationship("UserQuery", back_populates="user", cascade="all, delete-orphan")
-    preferences = relationship("UserPreferences", back_populates="user", uselist=False, cascade="all, delete-orphan")
+    sessions = relationship("UserSession", back_populates="user", cascade="all, delete-orphan", lazy=LAZY_COLLECTION)
+    queries = relationship("UserQuery", back_populates="user", cascade="all, delete-orphan", lazy=LAZY_COLLECTION)
+    preferences = relationship("UserPreferences", back_populates="user", uselist=False, cascade="all, delete-orphan", lazy="joined")
+    credential = relationship("UserCredential", uselist=False, cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<User(id={self.id}, email='{self.email}', role='{self.role}')>"
     
+    @validates("email")
+    def _set_email_hash(self, key, email):
+        self.email_hash = hash_email(email)
+        return email
+    
+    @classmethod
+    def with_email(cls, email: str):
+        """Filter clause for the user with this email, probing the email_hash index"""
+        return cls.email_hash == hash_email(email)
+    
+    _SCALAR_FIELDS = (
+        "id", "email", "full_name", "phone_number", "is_active", "is_verified",
+        "avatar_url", "bio", "company_name", "job_title", "department",
+        "experience_years", "certifications", "expertise_areas", "employee_id",
+        "manager_email",
+    )
+    _ENUM_FIELDS = ("role", "status", "preferred_language")
+    _DT_FIELDS = ("created_at", "updated_at", "last_login_at", "approved_at")
+    
     def to_dict(self):
         """Convert user to dictionary"""
-        return {
-            "id": self.id,
-            "email": self.email,
-            "full_name": self.full_name,
-            "phone_number": self.phone_number,
-            "role": self.role.value if self.role else None,
-            "status": self.status.value if self.status else None,
-            "is_active": self.is_active,
-            "is_verified": self.is_verified,
-            "preferred_language": self.preferred_language.value if self.preferred_language else None,
-            "avatar_url": self.avatar_url,
-            "bio": self.bio,
-            "company_name": self.company_name,
-            "job_title": self.job_title,
-            "department": self.department,
-            "experience_years": self.experience_years,
-            "certifications": self.certifications,
-            "expertise_areas": self.expertise_areas,
-            "employee_id": self.employee_id,
-            "manager_email": self.manager_email,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "last_login_at": self.last_login_at.isoformat() if self.last_login_at else None,
-            "approved_at": self.approved_at.isoformat() if self.approved_at else None,
-        }
+        data = {name: getattr(self, name) for name in self._SCALAR_FIELDS}
+        for name in self._ENUM_FIELDS:
+            value = getattr(self, name)
+            data[name] = value.value if value is not None else None
+        for name in self._DT_FIELDS:
+            value = getattr(self, name)
+            data[name] = value.isoformat() if value is not None else None
+        return data
+
+
+maintain_updated_at(User.__table__)
 
 
 class UserSession(Base):
@@ -121,10 +157,10 @@ class UserSession(Base):
     __tablename__ = "user_sessions"
     
     # Primary fields
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(BIG_INTEGER_ID, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    session_token = Column(String(255), unique=True, index=True, nullable=False)
-    refresh_token = Column(String(255), unique=True, index=True, nullable=True)
+    session_token = Column(TokenHash, unique=True, index=True, nullable=False)
+    refresh_token = Column(TokenHash, unique=True, index=True, nullable=True)
     
     # Session metadata
     ip_address = Column(String(45), nullable=True)  # IPv6 support
@@ -137,8 +173,8 @@ class UserSession(Base):
     expires_at = Column(DateTime, nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    last_activity_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    last_activity_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     logged_out_at = Column(DateTime, nullable=True)
     
     # Relationships
@@ -148,15 +184,15 @@ class UserSession(Base):
         return f"<UserSession(id={self.id}, user_id={self.user_id}, is_active={self.is_active})>"
 
 
-class UserQuery(Base):
+class UserQuery(BulkInsertMixin, Base):
     """User query model for tracking AI interactions"""
     
     __tablename__ = "user_queries"
     
     # Primary fields
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # Nullable for anonymous queries
-    session_id = Column(String(255), index=True, nullable=True)
+    id = Column(BIG_INTEGER_ID, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Nullable for anonymous queries
+    session_id = Column(String(255), nullable=True)
     
     # Query content
     query_text = Column(Text, nullable=False)
@@ -183,23 +219,95 @@ class UserQuery(Base):
     device_info = Column(JSON, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
     responded_at = Column(DateTime, nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="queries")
     
+    __table_args__ = (
+        # Per-user history pages by id (keyset) and per-session history; these
+        # also cover plain user_id / session_id filters
+        Index("ix_user_queries_user_id", "user_id", "id"),
+        Index("ix_user_queries_session", "session_id", "created_at"),
+        # Recent-days range scanned by UserQueryDaily.refresh
+        Index("ix_user_queries_created", "created_at"),
+        LZ4_TABLE_OPTIONS,
+    )
+    
     def __repr__(self):
         return f"<UserQuery(id={self.id}, user_id={self.user_id}, kb_tier={self.knowledge_base_tier})>"
 
 
+class PreferenceFlag(enum.IntFlag):
+    """Bits of the on/off preferences packed into UserPreferences.flags"""
+    ENABLE_AUDIO_INPUT = 0x01
+    ENABLE_AUDIO_OUTPUT = 0x02
+    EMAIL_NOTIFICATIONS = 0x04
+    PUSH_NOTIFICATIONS = 0x08
+    SMS_NOTIFICATIONS = 0x10
+    ANALYTICS_TRACKING = 0x20
+    SESSION_RECORDING = 0x40
+    DATA_SHARING = 0x80
+
+
+DEFAULT_PREFERENCE_FLAGS = int(
+    PreferenceFlag.ENABLE_AUDIO_INPUT | PreferenceFlag.ENABLE_AUDIO_OUTPUT
+    | PreferenceFlag.EMAIL_NOTIFICATIONS | PreferenceFlag.PUSH_NOTIFICATIONS
+    | PreferenceFlag.ANALYTICS_TRACKING
+)
+
+
+def _preference_flag(bit: PreferenceFlag) -> hybrid_property:
+    """Boolean attribute backed by one bit of flags, usable in filters too"""
+    
+    def fget(self) -> bool:
+        flags = self.flags if self.flags is not None else DEFAULT_PREFERENCE_FLAGS
+        return bool(flags & bit)
+    
+    def fset(self, value: bool) -> None:
+        flags = self.flags if self.flags is not None else DEFAULT_PREFERENCE_FLAGS
+        self.flags = flags | bit if value else flags & ~bit
+    
+    def expr(cls):
+        return cls.flags.op("&")(int(bit)) != 0
+    
+    return hybrid_property(fget, fset, expr=expr)
+
+
+class UserCredential(Base):
+    """
+    Password hash for a user, kept out of the users row
+    
+    Only the login path reads it (session.get by user_id); users without a
+    row sign in by OTP only.
+    """
+    
+    __tablename__ = "user_credentials"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    password_hash = Column(String(255), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), server_onupdate=FetchedValue(), nullable=False)
+    
+    def __repr__(self):
+        return f"<UserCredential(user_id={self.user_id})>"
+
+
+maintain_updated_at(UserCredential.__table__)
+
+
 class UserPreferences(Base):
-    """User preferences model for customization settings"""
+    """
+    User preferences model for customization settings
+    
+    Loaded together with its User through one LEFT JOIN on the unique
+    user_id index (User.preferences is lazy="joined"), never a second SELECT.
+    """
     
     __tablename__ = "user_preferences"
     
     # Primary fields
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False, index=True)
     
     # UI Preferences
@@ -208,30 +316,32 @@ class UserPreferences(Base):
     timezone = Column(String(50), default="UTC", nullable=False)
     
     # Audio Preferences
-    enable_audio_input = Column(Boolean, default=True, nullable=False)
-    enable_audio_output = Column(Boolean, default=True, nullable=False)
     audio_speed = Column(Integer, default=1, nullable=False)  # 1-3 speed multiplier
     audio_voice = Column(String(50), default="default", nullable=False)
     
-    # Notification Preferences
-    email_notifications = Column(Boolean, default=True, nullable=False)
-    push_notifications = Column(Boolean, default=True, nullable=False)
-    sms_notifications = Column(Boolean, default=False, nullable=False)
-    
-    # Privacy Preferences
-    analytics_tracking = Column(Boolean, default=True, nullable=False)
-    session_recording = Column(Boolean, default=False, nullable=False)
-    data_sharing = Column(Boolean, default=False, nullable=False)
+    # Audio, notification and privacy switches, one bit each (PreferenceFlag)
+    flags = Column(SmallInteger, default=DEFAULT_PREFERENCE_FLAGS, server_default=str(DEFAULT_PREFERENCE_FLAGS), nullable=False)
+    enable_audio_input = _preference_flag(PreferenceFlag.ENABLE_AUDIO_INPUT)
+    enable_audio_output = _preference_flag(PreferenceFlag.ENABLE_AUDIO_OUTPUT)
+    email_notifications = _preference_flag(PreferenceFlag.EMAIL_NOTIFICATIONS)
+    push_notifications = _preference_flag(PreferenceFlag.PUSH_NOTIFICATIONS)
+    sms_notifications = _preference_flag(PreferenceFlag.SMS_NOTIFICATIONS)
+    analytics_tracking = _preference_flag(PreferenceFlag.ANALYTICS_TRACKING)
+    session_recording = _preference_flag(PreferenceFlag.SESSION_RECORDING)
+    data_sharing = _preference_flag(PreferenceFlag.DATA_SHARING)
     
     # Custom preferences (JSON)
     custom_settings = Column(JSON, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, default=func.now(), nullable=False)
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), server_onupdate=FetchedValue(), nullable=False)
     
     # Relationships
     user = relationship("User", back_populates="preferences")
     
     def __repr__(self):
         return f"<UserPreferences(id={self.id}, user_id={self.user_id}, theme='{self.theme}')>"
+
+
+maintain_updated_at(UserPreferences.__table__)
@@ -1,9 +1,7 @@
 """
 Services package for POORNASREE AI Platform
-"""
-
-from .ai_service import ai_service
 
-__all__ = [
-    "ai_service"
-]
+Import services from their modules (e.g. app.services.ai_service); the
+package itself stays empty so light modules such as weaviate_collections
+don't pull in the AI service and its models.
+"""
@@ -5,65 +5,106 @@ Integrates with Weaviate vector database and Google Gemini API
 # pylint: disable=import-error,no-name-in-module,logging-fstring-interpolation
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
-import json
+import functools
+import hashlib
+import heapq
+from datetime import datetime, timedelta, timezone
+from string import Template
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 
+import numpy as np
+import orjson
 import weaviate
+from weaviate.classes.query import Filter, MetadataQuery
 import google.generativeai as genai
 from sentence_transformers import SentenceTransformer
 
 from app.core.config import settings
+from app.services.embedding_cache import EmbeddingCache
+from app.services.weaviate_collections import DOCUMENT_TIERS, RESPONSE_CACHE_COLLECTION, document_collection_name
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_DIMENSION = 384
+EMBEDDING_BATCH_SIZE = 32
+# Texts per executor submission, and how many submissions may run at once
+EMBEDDING_SHARD_SIZE = 256
+MAX_CONCURRENT_ENCODES = 8
+WEAVIATE_HEALTH_CHECK_INTERVAL_SECONDS = 30
+
+# System instruction per user role; unknown roles get the customer one
+ROLE_PROMPTS = {
+    "customer": "You are a helpful maintenance assistant. Provide clear, simple answers suitable for equipment operators.",
+    "engineer": "You are a technical maintenance expert. Provide detailed technical information and troubleshooting steps.",
+    "admin": "You are a comprehensive maintenance expert with access to all technical documentation."
+}
+
+# Gemini prompt, compiled once at import; the role prompt is the model's system instruction
+PROMPT_TEMPLATE = Template("""
+Context Information:
+$context
+
+User Query: $query
+
+Please provide a helpful response based on the context information. If the context doesn't contain relevant information, provide general guidance and suggest consulting additional resources.
+""")
+
 class AIService:
     """AI Service for query processing and document retrieval"""
     
     def __init__(self):
         self.weaviate_client = None
+        self.weaviate_async_client = None
         self.embedding_model = None
         self.genai_model = None
+        self._role_models: Dict[str, Any] = {}
+        self.embedding_cache = None
+        self._encode_semaphore = asyncio.Semaphore(MAX_CONCURRENT_ENCODES)
+        # Readiness is probed in the background, not before every request
+        self._weaviate_ready = False
+        self._health_task: Optional[asyncio.Task] = None
+        self._async_connect_lock = asyncio.Lock()
         self._initialize_clients()
     
     def _initialize_clients(self):
         """Initialize AI service clients"""
         try:
-            # Initialize Weaviate client v4
-            if settings.weaviate_url.startswith('https://'):
-                # Cloud Weaviate instance
-                self.weaviate_client = weaviate.connect_to_weaviate_cloud(
-                    cluster_url=settings.weaviate_url,
-                    auth_credentials=weaviate.auth.AuthApiKey(settings.weaviate_api_key),
-                    additional_config=weaviate.classes.init.AdditionalConfig(
-                        timeout=weaviate.classes.init.Timeout(init=60, query=120, insert=180),
-                        grpc_host=settings.weaviate_grpc_url if settings.weaviate_grpc_url else None,
-                        grpc_port=443
-                    )
-                )
-            else:
-                # Local Weaviate instance
-                self.weaviate_client = weaviate.connect_to_local(
-                    host=settings.weaviate_url.replace('http://', '').replace('https://', '').split(':')[0],
-                    port=int(settings.weaviate_url.split(':')[-1]) if ':' in settings.weaviate_url else 8080,
-                    headers={"X-OpenAI-Api-Key": settings.weaviate_api_key} if settings.weaviate_api_key else None
-                )
+            # Initialize Weaviate clients v4: the sync client answers readiness
+            # probes, the async client (connected on first use) serves queries
+            self.weaviate_client = self._create_weaviate_client(use_async=False)
+            self.weaviate_async_client = self._create_weaviate_client(use_async=True)
             
             # Test Weaviate connection
-            if self.weaviate_client.is_ready():
+            self._weaviate_ready = self.weaviate_client.is_ready()
+            if self._weaviate_ready:
                 logger.info("✅ Weaviate client initialized successfully")
             else:
                 logger.warning("⚠️ Weaviate client not ready")
             
             # Initialize Google Gemini
             genai.configure(api_key=settings.google_api_key)
-            self.genai_model = genai.GenerativeModel(settings.gemini_model)
+            # One model per role with its prompt as the system instruction, so
+            # the instruction is not resent inside every user prompt
+            self._role_models = {
+                role: genai.GenerativeModel(settings.gemini_model, system_instruction=role_prompt)
+                for role, role_prompt in ROLE_PROMPTS.items()
+            }
+            self.genai_model = self._role_models["customer"]
             logger.info("✅ Google Gemini API initialized successfully")
             
             # Initialize sentence transformer for embeddings
             try:
-                self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-                logger.info("✅ Sentence transformer model loaded successfully")
+                self.embedding_model, variant = self._load_embedding_model()
+                # Run one batch now so the first request doesn't pay for allocating
+                # buffers and ONNX Runtime / PyTorch graph optimization
+                self.embedding_model.encode(
+                    ["warmup"] * EMBEDDING_BATCH_SIZE, batch_size=EMBEDDING_BATCH_SIZE, show_progress_bar=False
+                )
+                # Quantized and full-precision vectors differ slightly, so they are cached apart
+                self.embedding_cache = EmbeddingCache(f"{EMBEDDING_MODEL_NAME}-{variant}")
+                logger.info(f"✅ Sentence transformer model loaded successfully ({variant})")
             except Exception as e:
                 logger.warning(f"⚠️ Could not load sentence transformer: {e}")
                 self.embedding_model = None
@@ -72,6 +113,103 @@ class AIService:
             logger.error(f"❌ Failed to initialize AI services: {e}")
             # Don't raise - allow graceful degradation
     
+    @staticmethod
+    def _load_embedding_model() -> Tuple[SentenceTransformer, str]:
+        """
+        Load the embedding model, preferring the INT8-quantized ONNX export
+        
+        The ONNX file ships with the model on the Hugging Face hub and runs on
+        ONNX Runtime's CPU provider; pooling stays in SentenceTransformer.
+        Falls back to the PyTorch weights if ONNX Runtime is unavailable.
+        """
+        if settings.embedding_backend == "onnx":
+            try:
+                model = SentenceTransformer(
+                    EMBEDDING_MODEL_NAME,
+                    backend="onnx",
+                    model_kwargs={
+                        "file_name": settings.embedding_onnx_file,
+                        "provider": "CPUExecutionProvider"
+                    }
+                )
+                return model, "onnx-" + settings.embedding_onnx_file.rsplit("/", 1)[-1].removesuffix(".onnx")
+            except Exception as e:
+                logger.warning(f"⚠️ Could not load ONNX embedding model, using PyTorch: {e}")
+        return SentenceTransformer(EMBEDDING_MODEL_NAME), "torch"
+    
+    def _create_weaviate_client(self, use_async: bool):
+        """Create a Weaviate client for settings.weaviate_url"""
+        if settings.weaviate_url.startswith('https://'):
+            # Cloud Weaviate instance
+            connect = weaviate.use_async_with_weaviate_cloud if use_async else weaviate.connect_to_weaviate_cloud
+            return connect(
+                cluster_url=settings.weaviate_url,
+                auth_credentials=weaviate.auth.AuthApiKey(settings.weaviate_api_key),
+                additional_config=weaviate.classes.init.AdditionalConfig(
+                    timeout=weaviate.classes.init.Timeout(init=60, query=120, insert=180),
+                    connection=self._connection_config(),
+                    grpc_host=settings.weaviate_grpc_url if settings.weaviate_grpc_url else None,
+                    grpc_port=443
+                )
+            )
+        
+        # Local Weaviate instance
+        connect = weaviate.use_async_with_local if use_async else weaviate.connect_to_local
+        return connect(
+            host=settings.weaviate_url.replace('http://', '').replace('https://', '').split(':')[0],
+            port=int(settings.weaviate_url.split(':')[-1]) if ':' in settings.weaviate_url else 8080,
+            headers={"X-OpenAI-Api-Key": settings.weaviate_api_key} if settings.weaviate_api_key else None,
+            additional_config=weaviate.classes.init.AdditionalConfig(connection=self._connection_config())
+        )
+    
+    async def _async_collection(self, name: str):
+        """Get a collection from the async Weaviate client, connecting it on first use"""
+        if not self.weaviate_async_client.is_connected():
+            async with self._async_connect_lock:
+                if not self.weaviate_async_client.is_connected():
+                    await self.weaviate_async_client.connect()
+        return self.weaviate_async_client.collections.get(name)
+    
+    @staticmethod
+    def _connection_config():
+        """HTTP session pool sized so concurrent searches share warm connections"""
+        from weaviate.config import ConnectionConfig
+        return ConnectionConfig(session_pool_connections=32, session_pool_maxsize=64)
+    
+    @property
+    def weaviate_available(self) -> bool:
+        """Whether the Weaviate client exists and passed its last readiness probe"""
+        return self.weaviate_client is not None and self._weaviate_ready
+    
+    async def _watch_weaviate(self) -> None:
+        """Background readiness probe"""
+        while True:
+            await asyncio.sleep(WEAVIATE_HEALTH_CHECK_INTERVAL_SECONDS)
+            if self.weaviate_client is None:
+                continue
+            try:
+                ready = await asyncio.to_thread(self.weaviate_client.is_ready)
+            except Exception:
+                ready = False
+            if ready != self._weaviate_ready:
+                logger.info(f"Weaviate readiness changed: {ready}")
+            self._weaviate_ready = ready
+    
+    def start(self) -> None:
+        """Start the background Weaviate readiness probe on the running event loop"""
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._watch_weaviate())
+    
+    async def stop(self) -> None:
+        """Stop the background readiness probe"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+    
     def close_connections(self):
         """Properly close all AI service connections"""
         try:
@@ -81,124 +219,172 @@ class AIService:
         except Exception as e:
             logger.warning(f"⚠️ Warning closing Weaviate connection: {e}")
     
-    def __del__(self):
-        """Destructor to ensure connections are closed"""
-        try:
-            self.close_connections()
-        except Exception:
-            pass  # Ignore errors during cleanup
+    async def aclose(self):
+        """Stop background work and close all connections; called from the app lifespan"""
+        await self.stop()
+        if self.embedding_cache is not None:
+            await self.embedding_cache.close()
+        if self.weaviate_async_client is not None:
+            await self.weaviate_async_client.close()
+        # The sync Weaviate client's close blocks on its gRPC channel
+        await asyncio.to_thread(self.close_connections)
     
-    async def generate_embeddings(self, text: str) -> List[float]:
-        """Generate embeddings for text"""
+    async def generate_embeddings(self, text: str) -> np.ndarray:
+        """Generate a float32 embedding for text; convert with tolist() only at an API boundary"""
         try:
             if self.embedding_model is None:
-                # Fallback: use simple hash-based embeddings
-                import hashlib
-                text_hash = hashlib.md5(text.encode()).hexdigest()
-                # Convert to 384-dimensional vector (matching sentence transformer)
-                embedding = [float(int(text_hash[i:i+2], 16)) / 255.0 for i in range(0, len(text_hash), 2)]
-                embedding.extend([0.0] * (384 - len(embedding)))  # Pad to 384 dimensions
-                return embedding[:384]
-            
-            # Use sentence transformer
-            embedding = await asyncio.get_event_loop().run_in_executor(
-                None, self.embedding_model.encode, text
-            )
-            return embedding.tolist()
+                # Fallback: deterministic unit vector seeded from a hash of the text
+                seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+                embedding = np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSION, dtype=np.float32)
+                embedding /= np.linalg.norm(embedding)
+                return embedding
+            
+            # Use sentence transformer, through the embedding cache
+            return (await self.generate_embeddings_many([text]))[0]
             
         except Exception as e:
             logger.error(f"Failed to generate embeddings: {e}")
             # Return zero vector as fallback
-            return [0.0] * 384
+            return np.zeros(EMBEDDING_DIMENSION, dtype=np.float32)
+    
+    async def generate_embeddings_many(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Generate embeddings for several texts, encoding only cache misses
+        
+        Cached vectors come back from one Redis MGET; the remaining distinct
+        texts are encoded in shards of EMBEDDING_SHARD_SIZE, run concurrently
+        in the executor (at most MAX_CONCURRENT_ENCODES at a time), and then
+        cached. encode sorts each shard by length before batching, so each
+        mini-batch pads only to its own longest text.
+        """
+        if self.embedding_model is None:
+            return [await self.generate_embeddings(text) for text in texts]
+        
+        vectors = await self.embedding_cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            shards = [missing[start:start + EMBEDDING_SHARD_SIZE] for start in range(0, len(missing), EMBEDDING_SHARD_SIZE)]
+            encoded = await asyncio.gather(*(self._encode_shard(shard) for shard in shards))
+            computed = dict(zip(missing, (vector for shard in encoded for vector in shard)))
+            await self.embedding_cache.put_many(missing, [computed[text] for text in missing])
+            vectors = [vector if vector is not None else computed[text] for text, vector in zip(texts, vectors)]
+        return vectors
     
     async def store_document_in_weaviate(self, doc_id: int, title: str, content: str, 
                                        knowledge_base_tier: int, metadata: Dict[str, Any]) -> bool:
-        """Store document in Weaviate vector database"""
+        """Store document in Weaviate vector database, through store_documents_batch"""
+        stored = await self.store_documents_batch([{
+            "doc_id": doc_id,
+            "title": title,
+            "content": content,
+            "knowledge_base_tier": knowledge_base_tier,
+            "metadata": metadata
+        }])
+        return stored == 1
+    
+    async def _encode_shard(self, texts: List[str]) -> List[np.ndarray]:
+        """Encode one shard of texts in the default executor"""
+        encode = functools.partial(
+            self.embedding_model.encode, batch_size=EMBEDDING_BATCH_SIZE, show_progress_bar=False
+        )
+        async with self._encode_semaphore:
+            encoded = await asyncio.get_event_loop().run_in_executor(None, encode, texts)
+        return list(encoded)
+    
+    async def store_documents_batch(self, documents: List[Dict[str, Any]]) -> int:
+        """
+        Store many documents in Weaviate with one batched encode and one
+        insert_many per tier collection, run concurrently
+        
+        Each document is a dict with doc_id, title, content, knowledge_base_tier
+        and metadata, the same fields store_document_in_weaviate takes.
+        
+        Returns:
+            int: Number of documents stored
+        """
         try:
-            if not self.weaviate_client or not self.weaviate_client.is_ready():
+            if not documents:
+                return 0
+            if not self.weaviate_available:
                 logger.warning("Weaviate client not available, skipping vector storage")
-                return False
-            
-            # Generate embeddings
-            embeddings = await self.generate_embeddings(content)
-            
-            # Prepare document object
-            document_object = {
-                "doc_id": doc_id,
-                "title": title,
-                "content": content[:5000],  # Limit content size
-                "knowledge_base_tier": knowledge_base_tier,
-                "metadata": json.dumps(metadata)
-            }
+                return 0
             
-            # Store in Weaviate using v4 API
-            documents_collection = self.weaviate_client.collections.get("Document")
-            documents_collection.data.insert(
-                properties=document_object,
-                vector=embeddings
-            )
+            from weaviate.classes.data import DataObject
+            
+            embeddings = await self.generate_embeddings_many([doc["content"] for doc in documents])
             
-            logger.info(f"✅ Document {doc_id} stored in Weaviate successfully")
-            return True
+            objects_by_tier: Dict[int, List[Tuple[Dict[str, Any], Any]]] = {}
+            for doc, vector in zip(documents, embeddings):
+                objects_by_tier.setdefault(doc["knowledge_base_tier"], []).append((doc, DataObject(
+                    properties={
+                        "doc_id": doc["doc_id"],
+                        "title": doc["title"],
+                        "content": doc["content"][:5000],  # Limit content size
+                        "knowledge_base_tier": doc["knowledge_base_tier"],
+                        "metadata": orjson.dumps(doc["metadata"], option=orjson.OPT_NON_STR_KEYS).decode()
+                    },
+                    vector=vector
+                )))
+            
+            async def insert_tier(tier: int, entries: List[Tuple[Dict[str, Any], Any]]) -> int:
+                documents_collection = await self._async_collection(document_collection_name(tier))
+                result = await documents_collection.data.insert_many([obj for _, obj in entries])
+                for index, error in result.errors.items():
+                    logger.error(f"Failed to store document {entries[index][0]['doc_id']} in Weaviate: {error.message}")
+                return len(entries) - len(result.errors)
+            
+            stored = sum(await asyncio.gather(*(
+                insert_tier(tier, entries) for tier, entries in objects_by_tier.items()
+            )))
+            logger.info(f"✅ {stored} of {len(documents)} documents stored in Weaviate")
+            return stored
             
         except Exception as e:
-            logger.error(f"Failed to store document in Weaviate: {e}")
-            return False
+            logger.error(f"Failed to store documents in Weaviate: {e}")
+            return 0
     
     async def search_similar_documents(self, query: str, knowledge_base_tier: int, 
-                                     limit: int = 5) -> List[Dict[str, Any]]:
+                                     limit: int = 5,
+                                     query_embeddings: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """Search for similar documents using vector similarity"""
         try:
-            if not self.weaviate_client or not self.weaviate_client.is_ready():
+            if not self.weaviate_available:
                 logger.warning("Weaviate client not available, returning empty results")
                 return []
             
-            # Generate query embeddings
-            query_embeddings = await self.generate_embeddings(query)
-            
-            # Search in Weaviate using v4 API
-            documents_collection = self.weaviate_client.collections.get("Document")
+            # Generate query embeddings unless the caller already has them
+            if query_embeddings is None:
+                query_embeddings = await self.generate_embeddings(query)
             
-            # Use correct v4 API syntax - separate the filtering and vector search
-            try:
-                # First try with filtering
-                result = documents_collection.query.near_vector(
-                    near_vector=query_embeddings,
-                    limit=limit,
-                    return_metadata=weaviate.classes.query.MetadataQuery(distance=True)
-                )
-                
-                # Apply filtering if possible (this might need different syntax)
-                # For now, let's get all results and filter in Python
-                all_results = result.objects
-                filtered_results = []
-                
-                for obj in all_results:
-                    tier = obj.properties.get("knowledge_base_tier", 999)
-                    if tier <= knowledge_base_tier:
-                        filtered_results.append(obj)
-                
-                # Limit the results
-                filtered_results = filtered_results[:limit]
-                
-            except Exception as e:
-                logger.warning(f"Filtering failed, trying without filter: {e}")
-                # Fallback: search without filtering
-                result = documents_collection.query.near_vector(
+            # Search every tier collection this tier may see, concurrently,
+            # then keep the overall top `limit` by distance
+            async def search_tier(tier: int):
+                documents_collection = await self._async_collection(document_collection_name(tier))
+                result = await documents_collection.query.near_vector(
                     near_vector=query_embeddings,
                     limit=limit,
-                    return_metadata=weaviate.classes.query.MetadataQuery(distance=True)
+                    return_metadata=MetadataQuery(distance=True),
+                    return_properties=["doc_id", "title", "content", "metadata"]
                 )
-                filtered_results = result.objects[:limit]
+                return result.objects
+            
+            tier_results = await asyncio.gather(*(
+                search_tier(tier) for tier in DOCUMENT_TIERS if tier <= knowledge_base_tier
+            ))
+            objects = heapq.nsmallest(
+                limit,
+                (obj for objects in tier_results for obj in objects),
+                key=lambda obj: obj.metadata.distance
+            )
             
             formatted_results = []
-            for obj in filtered_results:
+            for obj in objects:
                 formatted_results.append({
                     "doc_id": obj.properties.get("doc_id"),
                     "title": obj.properties.get("title"),
                     "content": obj.properties.get("content", "")[:200],  # Preview
                     "relevance_score": 1.0 - obj.metadata.distance if obj.metadata.distance else 0.5,
-                    "metadata": json.loads(obj.properties.get("metadata", "{}"))
+                    "metadata": orjson.loads(obj.properties.get("metadata") or "{}")
                 })
             
             return formatted_results
@@ -207,6 +393,31 @@ class AIService:
             logger.error(f"Failed to search documents in Weaviate: {e}")
             return []
     
+    def _model_for_role(self, user_role: str):
+        """Gemini model carrying the system instruction for user_role"""
+        return self._role_models.get(user_role, self.genai_model)
+    
+    @staticmethod
+    def _build_prompt(query: str, context_documents: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+        """Build the Gemini prompt and the source list for context_documents"""
+        # Prepare context from documents
+        context = "\n\n".join(
+            f"Document: {doc.get('title', 'Untitled')}\nContent: {doc.get('content', '')}"
+            for doc in context_documents
+        )
+        sources = []
+        
+        for doc in context_documents:
+            sources.append({
+                "document_id": doc.get('doc_id'),
+                "title": doc.get('title', 'Untitled'),
+                "relevance_score": doc.get('relevance_score', 0.5),
+                "content_preview": (doc.get('content', '')[:150] + "...") if len(doc.get('content', '')) > 150 else doc.get('content', '')
+            })
+        
+        prompt = PROMPT_TEMPLATE.substitute(context=context, query=query)
+        return prompt, sources
+    
     async def generate_ai_response(self, query: str, context_documents: List[Dict[str, Any]], 
                                  user_role: str = "customer") -> Dict[str, Any]:
         """Generate AI response using Google Gemini"""
@@ -220,44 +431,10 @@ class AIService:
                     "processing_time": 0.1
                 }
             
-            # Prepare context from documents
-            context = ""
-            sources = []
-            
-            for doc in context_documents:
-                context += f"Document: {doc.get('title', 'Untitled')}\\n"
-                context += f"Content: {doc.get('content', '')}\\n\\n"
-                sources.append({
-                    "document_id": doc.get('doc_id'),
-                    "title": doc.get('title', 'Untitled'),
-                    "relevance_score": doc.get('relevance_score', 0.5),
-                    "content_preview": (doc.get('content', '')[:150] + "...") if len(doc.get('content', '')) > 150 else doc.get('content', '')
-                })
-            
-            # Create prompt based on user role
-            role_prompts = {
-                "customer": "You are a helpful maintenance assistant. Provide clear, simple answers suitable for equipment operators.",
-                "engineer": "You are a technical maintenance expert. Provide detailed technical information and troubleshooting steps.",
-                "admin": "You are a comprehensive maintenance expert with access to all technical documentation."
-            }
-            
-            system_prompt = role_prompts.get(user_role, role_prompts["customer"])
+            prompt, sources = self._build_prompt(query, context_documents)
             
             # Generate response
-            prompt = f"""
-{system_prompt}
-
-Context Information:
-{context}
-
-User Query: {query}
-
-Please provide a helpful response based on the context information. If the context doesn't contain relevant information, provide general guidance and suggest consulting additional resources.
-"""
-
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, self.genai_model.generate_content, prompt
-            )
+            response = await self._model_for_role(user_role).generate_content_async(prompt)
             
             return {
                 "response": response.text,
@@ -277,22 +454,102 @@ Please provide a helpful response based on the context information. If the conte
                 "error": str(e)
             }
     
+    async def get_cached_response(self, query_embeddings: np.ndarray, user_role: str,
+                                  knowledge_base_tier: int) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached response for a near-duplicate query
+        
+        A hit needs the same role and tier, an entry younger than
+        RESPONSE_CACHE_TTL_SECONDS, and cosine similarity of at least
+        RESPONSE_CACHE_MIN_SIMILARITY.
+        """
+        try:
+            if not self.weaviate_available:
+                return None
+            
+            cache_collection = await self._async_collection(RESPONSE_CACHE_COLLECTION)
+            oldest = datetime.now(timezone.utc) - timedelta(seconds=settings.response_cache_ttl_seconds)
+            result = await cache_collection.query.near_vector(
+                near_vector=query_embeddings,
+                limit=1,
+                distance=1.0 - settings.response_cache_min_similarity,
+                filters=(
+                    Filter.by_property("user_role").equal(user_role)
+                    & Filter.by_property("knowledge_base_tier").equal(knowledge_base_tier)
+                    & Filter.by_property("created_at").greater_than(oldest)
+                )
+            )
+            if not result.objects:
+                return None
+            return orjson.loads(result.objects[0].properties["response"])
+            
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {e}")
+            return None
+    
+    async def cache_response(self, query: str, query_embeddings: np.ndarray, user_role: str,
+                             knowledge_base_tier: int, ai_response: Dict[str, Any]) -> None:
+        """Store a generated response in the semantic cache"""
+        try:
+            if not self.weaviate_available:
+                return
+            
+            cache_collection = await self._async_collection(RESPONSE_CACHE_COLLECTION)
+            await cache_collection.data.insert(
+                properties={
+                    "query": query,
+                    "response": orjson.dumps({
+                        key: ai_response[key]
+                        for key in ("response", "confidence", "sources", "model_used")
+                        if key in ai_response
+                    }).decode(),
+                    "user_role": user_role,
+                    "knowledge_base_tier": knowledge_base_tier,
+                    "created_at": datetime.now(timezone.utc)
+                },
+                vector=query_embeddings
+            )
+            
+        except Exception as e:
+            logger.warning(f"Failed to cache response: {e}")
+    
+    async def _lookup(self, query: str, user_role: str,
+                      knowledge_base_tier: int) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], np.ndarray]:
+        """
+        Embed query, then check the response cache and search documents concurrently
+        
+        One embedding serves both lookups. Returns the cached response (None
+        on a miss), the relevant documents and the query embedding.
+        """
+        query_embeddings = await self.generate_embeddings(query)
+        cached_response, relevant_docs = await asyncio.gather(
+            self.get_cached_response(query_embeddings, user_role, knowledge_base_tier),
+            self.search_similar_documents(query, knowledge_base_tier, limit=5, query_embeddings=query_embeddings)
+        )
+        return cached_response, relevant_docs, query_embeddings
+    
     async def process_query(self, query: str, user_role: str = "customer", 
                            knowledge_base_tier: int = 1) -> Dict[str, Any]:
         """Complete query processing pipeline"""
         start_time = asyncio.get_event_loop().time()
         
         try:
-            # Search for relevant documents
-            relevant_docs = await self.search_similar_documents(
-                query, knowledge_base_tier, limit=5
-            )
+            cached_response, relevant_docs, query_embeddings = await self._lookup(query, user_role, knowledge_base_tier)
+            
+            # Near-duplicate queries reuse a previously generated response
+            if cached_response is not None:
+                cached_response["processing_time"] = asyncio.get_event_loop().time() - start_time
+                return cached_response
             
             # Generate AI response
             ai_response = await self.generate_ai_response(
                 query, relevant_docs, user_role
             )
             
+            # Only real model output is cached, never fallback or error text
+            if "model_used" in ai_response:
+                await self.cache_response(query, query_embeddings, user_role, knowledge_base_tier, ai_response)
+            
             processing_time = asyncio.get_event_loop().time() - start_time
             ai_response["processing_time"] = processing_time
             
@@ -307,6 +564,55 @@ Please provide a helpful response based on the context information. If the conte
                 "processing_time": asyncio.get_event_loop().time() - start_time,
                 "error": str(e)
             }
+    
+    async def process_query_stream(self, query: str, user_role: str = "customer",
+                                   knowledge_base_tier: int = 1) -> Tuple[Dict[str, Any], AsyncIterator[str]]:
+        """
+        Streaming variant of process_query
+        
+        Returns the response metadata (sources, confidence, model_used) and
+        an async iterator of response text chunks. A cache hit yields the
+        cached response as a single chunk. A fully streamed model response is
+        added to the response cache once the iterator is exhausted.
+        """
+        cached_response, relevant_docs, query_embeddings = await self._lookup(query, user_role, knowledge_base_tier)
+        if cached_response is not None:
+            text = cached_response.pop("response", "")
+            
+            async def cached_chunks() -> AsyncIterator[str]:
+                yield text
+            
+            return cached_response, cached_chunks()
+        
+        if not self.genai_model:
+            fallback = await self.generate_ai_response(query, relevant_docs, user_role)
+            text = fallback.pop("response")
+            
+            async def fallback_chunks() -> AsyncIterator[str]:
+                yield text
+            
+            return fallback, fallback_chunks()
+        
+        prompt, sources = self._build_prompt(query, relevant_docs)
+        metadata = {
+            "confidence": 0.8,  # Default confidence
+            "sources": sources,
+            "model_used": settings.gemini_model
+        }
+        
+        async def model_chunks() -> AsyncIterator[str]:
+            parts = []
+            response = await self._model_for_role(user_role).generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+            await self.cache_response(
+                query, query_embeddings, user_role, knowledge_base_tier,
+                {**metadata, "response": "".join(parts)}
+            )
+        
+        return metadata, model_chunks()
 
 # Global AI service instance
 ai_service = AIService()
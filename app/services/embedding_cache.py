@@ -0,0 +1,102 @@
+"""
+Content-addressed embedding cache for POORNASREE AI Platform
+
+Embeddings are stored in Redis as raw float32 bytes under a key derived from
+the model name and a BLAKE2b digest of the text, so identical inputs (repeat
+queries, re-ingested chunks) skip the SentenceTransformer forward pass. A
+per-process LRU in front of Redis serves back-to-back repeats without a
+network round trip.
+"""
+# pylint: disable=import-error,broad-exception-caught
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+import numpy as np
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Redis-backed text -> vector cache for one embedding model
+    
+    Cache failures are logged and treated as misses, so an unavailable Redis
+    only costs the forward pass it would have saved. The in-memory LRU is
+    only touched from the event loop, so it needs no lock.
+    """
+    
+    __slots__ = ("model_name", "ttl_seconds", "memory_size", "redis", "_memory")
+    
+    def __init__(self, model_name: str, ttl_seconds: Optional[int] = None, memory_size: Optional[int] = None):
+        self.model_name = model_name
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.embedding_cache_ttl_seconds
+        self.memory_size = memory_size if memory_size is not None else settings.embedding_memory_cache_size
+        # Values are raw bytes, so responses must not be decoded
+        self.redis = aioredis.Redis.from_url(settings.redis_url, decode_responses=False)
+        # Redis key -> float32 vector, most recently used last
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+    
+    def _key(self, text: str) -> str:
+        """Redis key for text under this model"""
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        return f"emb:{self.model_name}:{digest}"
+    
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        """Add vector to the in-memory LRU, evicting the least recently used"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+    
+    async def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached vectors in memory, then the rest with a single MGET
+        
+        Returns:
+            List[Optional[np.ndarray]]: One read-only float32 vector per text, None on a miss
+        """
+        keys = [self._key(text) for text in texts]
+        vectors: List[Optional[np.ndarray]] = []
+        for key in keys:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+            vectors.append(vector)
+        
+        remote = [index for index, vector in enumerate(vectors) if vector is None]
+        if remote:
+            try:
+                values = await self.redis.mget([keys[index] for index in remote])
+            except Exception as e:
+                logger.warning("Embedding cache lookup failed: %s", e)
+                values = [None] * len(remote)
+            for index, value in zip(remote, values):
+                if value is not None:
+                    vectors[index] = np.frombuffer(value, dtype=np.float32)
+                    self._remember(keys[index], vectors[index])
+        
+        return vectors
+    
+    async def put_many(self, texts: Sequence[str], vectors: Sequence[np.ndarray]) -> None:
+        """Store vectors for texts in one pipelined round trip"""
+        if not texts:
+            return
+        arrays = [(self._key(text), np.asarray(vector, dtype=np.float32)) for text, vector in zip(texts, vectors)]
+        for key, array in arrays:
+            self._remember(key, array)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, array in arrays:
+                    pipe.setex(key, self.ttl_seconds, array.tobytes())
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Embedding cache store failed: %s", e)
+    
+    async def close(self):
+        """Close the Redis connection pool"""
+        await self.redis.aclose()
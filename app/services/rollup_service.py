@@ -0,0 +1,47 @@
+"""
+Analytics maintenance job for POORNASREE AI Platform
+Recomputes dashboard summary tables and keeps system_metrics partitioned
+ahead of time; run from a single scheduler (e.g. cron) rather than inside
+every API worker:
+
+    python -m app.services.rollup_service
+"""
+# pylint: disable=import-error
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from app.core.database import SessionLocal
+from app.models.analytics import SystemMetrics, UserQueryDaily
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_rollups(lookback_days: int = 1, today: Optional[date] = None, session_factory=SessionLocal) -> None:
+    """Recompute today's and the previous lookback_days' roll-up rows"""
+    since = (today or datetime.utcnow().date()) - timedelta(days=lookback_days)
+    with session_factory() as db:
+        try:
+            UserQueryDaily.refresh(db, since)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    logger.info("Roll-up tables refreshed since %s", since)
+
+
+def ensure_metric_partitions(today: Optional[date] = None, session_factory=SessionLocal) -> List[str]:
+    """Make sure system_metrics has partitions through next month"""
+    next_month = ((today or datetime.utcnow().date()).replace(day=1) + timedelta(days=32)).replace(day=1)
+    with session_factory() as db:
+        added = SystemMetrics.ensure_month_partitions(db, next_month)
+    if added:
+        logger.info("Added system_metrics partitions: %s", ", ".join(added))
+    return added
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    ensure_metric_partitions()
+    refresh_rollups()
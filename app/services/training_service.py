@@ -6,11 +6,12 @@ Handles model training, versioning, and feedback collection
 
 import logging
 import asyncio
+import re
 import uuid
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, case
 
 from app.models.training import (
     TrainingJob, ModelVersion, ModelEvaluation, DatasetVersion,
@@ -23,6 +24,17 @@ from app.services.ai_service import ai_service
 
 logger = logging.getLogger(__name__)
 
+# Keyword sentiment matchers, compiled once. Each keyword counts once if it
+# occurs anywhere in the text, as a case-insensitive substring; the
+# lookahead also finds keywords overlapping or inside others ("unhelpful"
+# counts "helpful" too)
+_POSITIVE_WORDS = re.compile(
+    r"(?=(good|great|excellent|helpful|useful|accurate|clear))", re.IGNORECASE
+)
+_NEGATIVE_WORDS = re.compile(
+    r"(?=(bad|poor|terrible|unhelpful|useless|wrong|confusing))", re.IGNORECASE
+)
+
 
 class TrainingService:
     """Training service for managing AI model training and feedback"""
@@ -47,13 +59,17 @@ class TrainingService:
         try:
             # Validate document access for the tier
             if document_ids:
-                valid_docs = db.query(Document).filter(
-                    Document.id.in_(document_ids),
-                    Document.knowledge_base_tier <= knowledge_base_tier
-                ).count()
-                
-                if valid_docs != len(document_ids):
-                    raise ValueError(f"Some documents are not accessible for tier {knowledge_base_tier}")
+                accessible_ids = {
+                    doc_id for (doc_id,) in db.query(Document.id).filter(
+                        Document.id.in_(set(document_ids)),
+                        Document.knowledge_base_tier <= knowledge_base_tier
+                    )
+                }
+                missing_ids = self._missing_document_ids(document_ids, accessible_ids)
+                if missing_ids:
+                    raise ValueError(
+                        f"Documents {missing_ids} are not accessible for tier {knowledge_base_tier}"
+                    )
             
             # Create training job
             training_job = TrainingJob(
@@ -76,8 +92,7 @@ class TrainingService:
             
             # Link documents if specified
             if document_ids:
-                documents = db.query(Document).filter(Document.id.in_(document_ids)).all()
-                training_job.documents.extend(documents)
+                Document.attach_to_training_job(db, training_job.id, document_ids)
                 db.commit()
             
             logger.info(f"Created training job {training_job.id}: {name}")
@@ -138,7 +153,7 @@ class TrainingService:
             
             for step_num, (step_name, step_weight) in enumerate(steps, 1):
                 job.current_step = step_name
-                job.progress_percentage = total_progress
+                job.progress_percentage = min(total_progress, 100)
                 db.commit()
                 
                 logger.info(f"Training job {job_id}: {step_name}")
@@ -146,10 +161,9 @@ class TrainingService:
                 # Simulate training step
                 await asyncio.sleep(2)  # Simulated processing time
                 
-                # Update progress
+                # The next step's commit (or completion) writes the new progress;
+                # nothing awaits in between, so a separate UPDATE here is wasted
                 total_progress += step_weight
-                job.progress_percentage = min(total_progress, 100)
-                db.commit()
             
             # Complete training
             job.status = TrainingStatusEnum.COMPLETED
@@ -227,18 +241,29 @@ class TrainingService:
         skip: int = 0,
         limit: int = 20,
         status: Optional[str] = None,
-        created_by: Optional[str] = None
-    ) -> List[TrainingJob]:
-        """Get training jobs with filters"""
-        query = db.query(TrainingJob)
+        created_by: Optional[str] = None,
+        before_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get training jobs with filters, as TrainingJobResponse-shaped dicts
+        
+        Jobs are ordered newest first by id, so the last id of a page is a
+        valid before_id cursor; with before_id, keyset pagination (id <
+        before_id) makes deep pages cost the same as the first one.
+        """
+        criteria = []
         
         if status:
-            query = query.filter(TrainingJob.status == TrainingStatusEnum(status))
+            criteria.append(TrainingJob.status == TrainingStatusEnum(status))
         
         if created_by:
-            query = query.filter(TrainingJob.created_by == created_by)
+            criteria.append(TrainingJob.created_by == created_by)
         
-        return query.order_by(desc(TrainingJob.created_at)).offset(skip).limit(limit).all()
+        if before_id is not None:
+            criteria.append(TrainingJob.id < before_id)
+            skip = 0
+        
+        return TrainingJob.list_dicts(db, *criteria, order_by=desc(TrainingJob.id), offset=skip, limit=limit)
     
     def get_model_versions(
         self,
@@ -246,18 +271,35 @@ class TrainingService:
         skip: int = 0,
         limit: int = 20,
         knowledge_base_tier: Optional[int] = None,
-        deployed_only: bool = False
+        deployed_only: bool = False,
+        before_id: Optional[int] = None,
+        max_tier: Optional[int] = None
     ) -> List[ModelVersion]:
-        """Get model versions with filters"""
+        """
+        Get model versions with filters, limited to tiers up to max_tier
+        
+        A requested knowledge_base_tier is matched exactly (capped at
+        max_tier); without one, every tier up to max_tier is listed.
+        Versions are ordered newest first by id; with before_id, keyset
+        pagination (id < before_id) is used like get_training_jobs.
+        """
         query = db.query(ModelVersion)
         
         if knowledge_base_tier:
+            if max_tier is not None:
+                knowledge_base_tier = min(knowledge_base_tier, max_tier)
             query = query.filter(ModelVersion.knowledge_base_tier == knowledge_base_tier)
+        elif max_tier is not None:
+            query = query.filter(ModelVersion.knowledge_base_tier <= max_tier)
         
         if deployed_only:
             query = query.filter(ModelVersion.is_deployed == True)
         
-        return query.order_by(desc(ModelVersion.created_at)).offset(skip).limit(limit).all()
+        if before_id is not None:
+            query = query.filter(ModelVersion.id < before_id)
+            skip = 0
+        
+        return query.order_by(desc(ModelVersion.id)).offset(skip).limit(limit).all()
     
     async def collect_feedback(
         self,
@@ -311,12 +353,8 @@ class TrainingService:
         """Analyze sentiment of feedback text"""
         try:
             # Simple sentiment analysis based on keywords
-            positive_words = ['good', 'great', 'excellent', 'helpful', 'useful', 'accurate', 'clear']
-            negative_words = ['bad', 'poor', 'terrible', 'unhelpful', 'useless', 'wrong', 'confusing']
-            
-            text_lower = text.lower()
-            positive_count = sum(1 for word in positive_words if word in text_lower)
-            negative_count = sum(1 for word in negative_words if word in text_lower)
+            positive_count = len({word.lower() for word in _POSITIVE_WORDS.findall(text)})
+            negative_count = len({word.lower() for word in _NEGATIVE_WORDS.findall(text)})
             
             if positive_count > negative_count:
                 return "positive"
@@ -331,35 +369,32 @@ class TrainingService:
     def get_training_metrics(self, db: Session) -> Dict[str, Any]:
         """Get training metrics and statistics"""
         try:
-            # Training job metrics
-            total_jobs = db.query(TrainingJob).count()
-            active_jobs = db.query(TrainingJob).filter(
-                TrainingJob.status == TrainingStatusEnum.RUNNING
-            ).count()
-            completed_jobs = db.query(TrainingJob).filter(
-                TrainingJob.status == TrainingStatusEnum.COMPLETED
-            ).count()
-            failed_jobs = db.query(TrainingJob).filter(
-                TrainingJob.status == TrainingStatusEnum.FAILED
-            ).count()
-            
-            # Average completion time
-            avg_duration = db.query(func.avg(TrainingJob.actual_duration_minutes)).filter(
-                TrainingJob.status == TrainingStatusEnum.COMPLETED
-            ).scalar() or 0
+            # Training job metrics, one conditional-aggregation pass
+            total_jobs, active_jobs, completed_jobs, failed_jobs, avg_duration = db.query(
+                func.count(TrainingJob.id),
+                func.sum(case((TrainingJob.status == TrainingStatusEnum.RUNNING, 1), else_=0)),
+                func.sum(case((TrainingJob.status == TrainingStatusEnum.COMPLETED, 1), else_=0)),
+                func.sum(case((TrainingJob.status == TrainingStatusEnum.FAILED, 1), else_=0)),
+                func.avg(case((TrainingJob.status == TrainingStatusEnum.COMPLETED, TrainingJob.actual_duration_minutes)))
+            ).one()
+            active_jobs = int(active_jobs or 0)
+            completed_jobs = int(completed_jobs or 0)
+            failed_jobs = int(failed_jobs or 0)
+            avg_duration = float(avg_duration or 0)
             
             # Success rate
             success_rate = (completed_jobs / total_jobs * 100) if total_jobs > 0 else 0
             
-            # Feedback metrics
-            total_feedback = db.query(FeedbackAnalytics).count()
-            avg_rating = db.query(func.avg(FeedbackAnalytics.rating)).filter(
-                FeedbackAnalytics.rating.isnot(None)
-            ).scalar() or 0
+            # Feedback metrics; AVG already skips NULL ratings
+            total_feedback, avg_rating = db.query(
+                func.count(FeedbackAnalytics.id), func.avg(FeedbackAnalytics.rating)
+            ).one()
+            avg_rating = float(avg_rating or 0)
             
             # Latest model version
-            latest_model = db.query(ModelVersion).order_by(desc(ModelVersion.created_at)).first()
-            latest_version = latest_model.version_number if latest_model else None
+            latest_version = db.query(ModelVersion.version_number).order_by(
+                desc(ModelVersion.created_at)
+            ).limit(1).scalar()
             
             return {
                 "total_jobs": total_jobs,
@@ -391,12 +426,13 @@ class TrainingService:
             
             # Validate documents
             documents = db.query(Document).filter(
-                Document.id.in_(document_ids),
+                Document.id.in_(set(document_ids)),
                 Document.knowledge_base_tier <= knowledge_base_tier
             ).all()
             
-            if len(documents) != len(document_ids):
-                raise ValueError("Some documents are not accessible or don't exist")
+            missing_ids = self._missing_document_ids(document_ids, {doc.id for doc in documents})
+            if missing_ids:
+                raise ValueError(f"Documents {missing_ids} are not accessible or don't exist")
             
             # Start batch processing
             self.batch_processors[batch_id] = {
@@ -418,6 +454,11 @@ class TrainingService:
             logger.error(f"Failed to start batch processing: {e}")
             raise
     
+    @staticmethod
+    def _missing_document_ids(document_ids: List[int], found_ids: set) -> List[int]:
+        """Requested document ids that the validation query did not return"""
+        return sorted(set(document_ids) - found_ids)
+    
     async def _execute_batch_processing(self, batch_id: str, documents: List[Document], processing_type: str):
         """Execute batch processing in background"""
         try:
@@ -0,0 +1,16 @@
+"""
+Weaviate collection names for POORNASREE AI Platform
+Kept free of client and model imports so schema tooling can use them cheaply
+"""
+
+# Documents live in one Weaviate collection (and HNSW index) per knowledge
+# base tier, so a search only traverses vectors the caller may see
+DOCUMENT_TIERS = (1, 2, 3)
+
+# Semantic cache of generated responses
+RESPONSE_CACHE_COLLECTION = "ResponseCache"
+
+
+def document_collection_name(knowledge_base_tier: int) -> str:
+    """Weaviate collection holding documents of one knowledge base tier"""
+    return f"Document_T{knowledge_base_tier}"
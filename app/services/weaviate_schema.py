@@ -8,6 +8,7 @@ from typing import Dict, Any
 
 import weaviate
 from app.core.config import settings
+from app.services.weaviate_collections import DOCUMENT_TIERS, RESPONSE_CACHE_COLLECTION, document_collection_name
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -50,11 +51,11 @@ class WeaviateSchemaManager:
             logger.error(f"❌ Failed to initialize Weaviate client: {e}")
             self.client = None
     
-    def get_document_schema(self) -> Dict[str, Any]:
-        """Get the Document class schema"""
+    def get_document_schema(self, knowledge_base_tier: int = DOCUMENT_TIERS[0]) -> Dict[str, Any]:
+        """Get the Document class schema for one knowledge base tier"""
         return {
-            "class": "Document",
-            "description": "Document storage for POORNASREE AI knowledge base",
+            "class": document_collection_name(knowledge_base_tier),
+            "description": f"Tier {knowledge_base_tier} document storage for POORNASREE AI knowledge base",
             "vectorizer": "none",  # We'll provide our own vectors
             "properties": [
                 {
@@ -100,6 +101,70 @@ class WeaviateSchemaManager:
             ]
         }
     
+    def get_response_cache_schema(self) -> Dict[str, Any]:
+        """Get the ResponseCache class schema (semantic cache of generated answers)"""
+        return {
+            "class": RESPONSE_CACHE_COLLECTION,
+            "description": "Generated responses keyed by query embedding, reused for near-duplicate queries",
+            "vectorizer": "none",  # Vectors are the query embeddings
+            "properties": [
+                {
+                    "name": "query",
+                    "dataType": ["text"],
+                    "description": "Query text the response was generated for"
+                },
+                {
+                    "name": "response",
+                    "dataType": ["text"],
+                    "description": "JSON-encoded response payload"
+                },
+                {
+                    "name": "user_role",
+                    "dataType": ["text"],
+                    "description": "Role the response was generated for"
+                },
+                {
+                    "name": "knowledge_base_tier",
+                    "dataType": ["int"],
+                    "description": "Knowledge base tier the response was generated from"
+                },
+                {
+                    "name": "created_at",
+                    "dataType": ["date"],
+                    "description": "When the response was cached"
+                }
+            ]
+        }
+    
+    def _create_collection(self, schema: Dict[str, Any]) -> None:
+        """Create a collection from a v3-style class schema"""
+        # Convert v3 schema to v4 collection configuration
+        from weaviate.classes.config import Configure, Property, DataType, VectorDistances
+        
+        properties = []
+        for prop in schema["properties"]:
+            if prop["dataType"] == ["int"]:
+                properties.append(Property(name=prop["name"], data_type=DataType.INT, description=prop["description"]))
+            elif prop["dataType"] == ["text"]:
+                properties.append(Property(name=prop["name"], data_type=DataType.TEXT, description=prop["description"]))
+            elif prop["dataType"] == ["date"]:
+                properties.append(Property(name=prop["name"], data_type=DataType.DATE, description=prop["description"]))
+        
+        self.client.collections.create(
+            name=schema["class"],
+            description=schema["description"],
+            properties=properties,
+            # We provide our own vectors; HNSW keeps them product-quantized
+            # (96 segments of 4 of the 384 dimensions, one byte each) so the
+            # index holds 96 bytes per vector instead of 1.5 KB of float32
+            vector_config=Configure.Vectors.self_provided(
+                vector_index_config=Configure.VectorIndex.hnsw(
+                    distance_metric=VectorDistances.COSINE,
+                    quantizer=Configure.VectorIndex.Quantizer.pq(segments=96)
+                )
+            )
+        )
+    
     def create_schema(self) -> bool:
         """Create the complete Weaviate schema"""
         try:
@@ -107,39 +172,22 @@ class WeaviateSchemaManager:
                 logger.error("Weaviate client not available")
                 return False
             
-            # Check if Document class already exists
+            # Skip classes that already exist
             try:
                 existing_collections = self.client.collections.list_all()
-                if "Document" in existing_collections:
-                    logger.info("Document collection already exists in Weaviate")
-                    return True
             except Exception:
-                # Collection doesn't exist, continue with creation
-                pass
-            
-            # Create Document collection using v4 API
-            document_schema = self.get_document_schema()
+                existing_collections = {}
             
-            # Convert v3 schema to v4 collection configuration
-            from weaviate.classes.config import Configure, Property, DataType
-            
-            properties = []
-            for prop in document_schema["properties"]:
-                if prop["dataType"] == ["int"]:
-                    properties.append(Property(name=prop["name"], data_type=DataType.INT, description=prop["description"]))
-                elif prop["dataType"] == ["text"]:
-                    properties.append(Property(name=prop["name"], data_type=DataType.TEXT, description=prop["description"]))
-                elif prop["dataType"] == ["date"]:
-                    properties.append(Property(name=prop["name"], data_type=DataType.DATE, description=prop["description"]))
-            
-            self.client.collections.create(
-                name="Document",
-                description=document_schema["description"],
-                properties=properties,
-                vector_config=Configure.VectorIndex.none()  # We provide our own vectors
-            )
+            # Create collections using v4 API
+            schemas = [self.get_document_schema(tier) for tier in DOCUMENT_TIERS]
+            schemas.append(self.get_response_cache_schema())
+            for schema in schemas:
+                if schema["class"] in existing_collections:
+                    logger.info(f"{schema['class']} collection already exists in Weaviate")
+                    continue
+                self._create_collection(schema)
+                logger.info(f"✅ {schema['class']} collection created successfully in Weaviate")
             
-            logger.info("✅ Document collection created successfully in Weaviate")
             return True
             
         except Exception as e:
@@ -153,8 +201,9 @@ class WeaviateSchemaManager:
                 logger.error("Weaviate client not available")
                 return False
             
-            self.client.collections.delete("Document")
-            logger.info("✅ Document collection deleted from Weaviate")
+            names = [document_collection_name(tier) for tier in DOCUMENT_TIERS] + [RESPONSE_CACHE_COLLECTION]
+            self.client.collections.delete(names)
+            logger.info(f"✅ {', '.join(names)} collections deleted from Weaviate")
             return True
             
         except Exception as e:
@@ -122,7 +122,7 @@ async def create_admin_user():
         with SessionLocal() as db:
             # Check if admin exists
             admin_exists = db.query(User).filter(
-                User.email == settings.admin_email,
+                User.with_email(settings.admin_email),
                 User.role == UserRoleEnum.ADMIN
             ).first()
             
@@ -3,6 +3,7 @@ Main FastAPI application for POORNASREE AI Platform
 """
 # pylint: disable=import-error,logging-fstring-interpolation,broad-exception-caught,wrong-import-order
 
+import inspect
 import logging
 import time
 from contextlib import asynccontextmanager
@@ -15,6 +16,8 @@ from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.core.database import init_db, close_db
+from app.core.security import get_email_service, get_otp_manager
+from app.services.ai_service import ai_service
 from app.api.auth.auth import router as auth_router
 from app.api.query.query import router as query_router
 from app.api.documents.documents import router as documents_router
@@ -42,15 +45,33 @@ async def lifespan(app: FastAPI):
         logger.error("Failed to initialize database: %s", e)
         raise
 
+    # Probe Weaviate readiness in the background instead of per request
+    ai_service.start()
+
+    # Build the OpenAPI schema now; FastAPI caches it on the app, so the
+    # first /openapi.json or /docs hit doesn't pay for walking every model
+    app.openapi()
+    logger.info("OpenAPI schema generated")
+
     yield
 
     # Shutdown
     logger.info("Shutting down POORNASREE AI Platform...")
-    try:
-        await close_db()
-        logger.info("Database connections closed")
-    except Exception as e:
-        logger.error("Error during shutdown: %s", e)
+    # Each resource is closed on its own so one failure doesn't leak the rest
+    closers = (
+        ("AI service", ai_service.aclose),
+        ("database connections", close_db),
+        ("email service", lambda: get_email_service().close()),
+        ("OTP store", lambda: get_otp_manager().close()),
+    )
+    for name, close in closers:
+        try:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+            logger.info("Closed %s", name)
+        except Exception as e:
+            logger.error("Error closing %s during shutdown: %s", name, e)
 
 
 # Create FastAPI application
@@ -70,6 +91,8 @@ app.add_middleware(
     allow_credentials=settings.cors_allow_credentials,
     allow_methods=settings.cors_allow_methods,
     allow_headers=settings.cors_allow_headers,
+    # Keyset-paginated listings return their next cursor in this header
+    expose_headers=["X-Next-Before-Id"],
 )
 
 # Add trusted host middleware (security)
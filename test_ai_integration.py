@@ -63,17 +63,8 @@ async def test_ai_integration():
         }
     ]
     
-    stored_count = 0
-    for doc in sample_documents:
-        success = await ai_service.store_document_in_weaviate(
-            doc["doc_id"], doc["title"], doc["content"], 
-            doc["knowledge_base_tier"], doc["metadata"]
-        )
-        if success:
-            stored_count += 1
-            print(f"✅ Stored document: {doc['title']}")
-        else:
-            print(f"❌ Failed to store document: {doc['title']}")
+    # One batched encode and one insert per tier collection
+    stored_count = await ai_service.store_documents_batch(sample_documents)
     
     print(f"\n📊 Summary: {stored_count}/{len(sample_documents)} documents stored successfully")
     
@@ -0,0 +1,87 @@
+"""
+In-memory stand-in for redis.asyncio.Redis used by unit tests
+"""
+import asyncio
+
+
+class FakePipeline:
+    """Queues setex calls and applies them on execute"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, ttl, value))
+        return self
+
+    async def execute(self):
+        self.redis.pipelines_executed += 1
+        return [await self.redis.setex(key, ttl, value) for key, ttl, value in self.commands]
+
+
+class FakeRedis:
+    """
+    Subset of the redis.asyncio API backed by a dict
+
+    Every command yields to the event loop first, so concurrent callers
+    interleave between commands the way they would against a real server.
+    Set fail=True to make every command raise.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.fail = False
+        self.mget_calls = 0
+        self.pipelines_executed = 0
+
+    async def _tick(self):
+        await asyncio.sleep(0)
+        if self.fail:
+            raise ConnectionError("fake redis is down")
+
+    async def get(self, key):
+        await self._tick()
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        await self._tick()
+        self.mget_calls += 1
+        return [self.data.get(key) for key in keys]
+
+    async def setex(self, key, ttl, value):
+        await self._tick()
+        self.data[key] = value
+        self.ttls[key] = ttl
+        return True
+
+    async def getdel(self, key):
+        await self._tick()
+        self.ttls.pop(key, None)
+        return self.data.pop(key, None)
+
+    async def incr(self, key):
+        await self._tick()
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    async def delete(self, *keys):
+        await self._tick()
+        removed = 0
+        for key in keys:
+            self.ttls.pop(key, None)
+            removed += self.data.pop(key, None) is not None
+        return removed
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
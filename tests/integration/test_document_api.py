@@ -2,6 +2,7 @@
 Test cases for Document Management API endpoints
 """
 # pylint: disable=import-error,no-name-in-module,trailing-whitespace,line-too-long,duplicate-code
+import hashlib
 import pytest
 import tempfile
 import os
@@ -13,14 +14,20 @@ from unittest.mock import patch, MagicMock
 import httpx
 
 from main import app
-from app.core.database import get_db, Base
+from app.core.database import get_db, Base, _json_serializer
 from app.models.user import User, UserRoleEnum
 from app.models.knowledge_base import Document, DocumentTypeEnum, DocumentStatusEnum, KnowledgeBaseTierEnum
 from app.core.security import security_manager
 
 # Test database setup
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test_documents.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# JSON columns are written with the app engine's serializer (orjson), so
+# stored JSON text matches production byte for byte
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    json_serializer=_json_serializer
+)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create test database
@@ -77,7 +84,7 @@ def test_document(test_user):
         file_size=1024,
         file_type=DocumentTypeEnum.PDF,
         mime_type="application/pdf",
-        file_hash="test_hash",
+        file_hash=hashlib.sha256(b"test_hash").digest(),
         knowledge_base_tier=KnowledgeBaseTierEnum.ENGINEER,
         category="Manual",
         description="Test document description",
@@ -297,15 +304,48 @@ class TestDocumentSearch:
             "category": "Manual",
             "limit": 5
         }
-        
+
         response = client.post(
             "/v1/documents/search",
             headers=auth_headers,
             json=search_data
         )
-        
+
         assert response.status_code == 200
 
+    def test_search_documents_by_tags(self, auth_headers, test_document):
+        """Test tag search matches any requested tag"""
+        db = TestingSessionLocal()
+        document = db.get(Document, test_document.id)
+        document.tags = ["hydraulics", "pump_50%", "पंप"]
+        db.commit()
+        db.close()
+
+        def search(tags):
+            response = client.post(
+                "/v1/documents/search",
+                headers=auth_headers,
+                json={"tags": tags, "limit": 100}
+            )
+            assert response.status_code == 200
+            return [doc["document_id"] for doc in response.json()["documents"]]
+
+        assert test_document.id in search(["gearbox", "hydraulics"])
+        assert test_document.id in search(["pump_50%"])
+        assert test_document.id in search(["पंप"])
+        assert test_document.id not in search(["hydraulic"])
+        assert test_document.id not in search(["pump_5%"])
+
+    def test_search_documents_rejects_long_tags(self, auth_headers):
+        """Test tags longer than the indexed length are rejected"""
+        response = client.post(
+            "/v1/documents/search",
+            headers=auth_headers,
+            json={"tags": ["x" * 101]}
+        )
+
+        assert response.status_code == 422
+
 class TestDocumentCategories:
     """Test document categories functionality"""
     
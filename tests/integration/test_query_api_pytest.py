@@ -7,14 +7,18 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from unittest.mock import AsyncMock, patch
+
+import orjson
 from httpx import AsyncClient
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from main import app
-from app.core.database import Base
-from app.models.user import User, UserRoleEnum
+from app.core.database import Base, get_db
+from app.models.user import User, UserQuery, UserRoleEnum
 from app.core.security import security_manager
+from app.services.ai_service import ai_service
 
 # Test database setup (reuse from document tests)
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test_documents.db"
@@ -160,3 +164,46 @@ def test_query_performance(client, auth_headers):
     # Verify reasonable performance (under 120 seconds for real AI)
     assert processing_time < 120
     print(f"Query processing time: {processing_time:.2f}s")
+
+def test_query_stream_events(client, auth_headers):
+    """Test the stream endpoint emits metadata, one token per chunk, then done"""
+    async def chunks():
+        yield "Check the "
+        yield "bearings."
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    metadata = {"confidence": 0.8, "sources": [{"document_id": 7, "title": "Pump manual"}], "model_used": "gemini"}
+    with patch.dict(app.dependency_overrides, {get_db: override_get_db}), \
+            patch("app.api.query.query.SessionLocal", TestingSessionLocal), \
+            patch.object(ai_service, "process_query_stream", AsyncMock(return_value=(metadata, chunks()))):
+        response = client.post(
+            "/v1/query/ask/stream",
+            headers=auth_headers,
+            json={"query": "Why is the pump noisy?", "query_type": "technical", "language": "en"}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        events.append((event_line[len("event: "):], orjson.loads(data_line[len("data: "):])))
+
+    assert [name for name, _ in events] == ["metadata", "token", "token", "done"]
+    assert events[0][1]["sources"] == metadata["sources"]
+    assert events[0][1]["confidence_score"] == 0.8
+    assert [data for name, data in events if name == "token"] == ["Check the ", "bearings."]
+    assert events[-1][1]["response_time"] >= 0
+
+    db = TestingSessionLocal()
+    stored = db.get(UserQuery, events[0][1]["query_id"])
+    assert stored.response_text == "Check the bearings."
+    db.delete(stored)
+    db.commit()
+    db.close()
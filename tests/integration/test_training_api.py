@@ -3,6 +3,7 @@ Tests for Training API endpoints
 """
 # pylint: disable=not-callable,no-member,import-error,no-name-in-module,trailing-whitespace,unused-import,wrong-import-order
 
+import hashlib
 import pytest
 import asyncio
 from datetime import datetime
@@ -13,9 +14,10 @@ from sqlalchemy.orm import sessionmaker
 from unittest.mock import patch, MagicMock
 
 from main import app
+from app.core.config import settings
 from app.core.database import get_db, Base
 from app.models.user import User, UserRoleEnum
-from app.models.training import TrainingJob, ModelVersion, TrainingStatusEnum
+from app.models.training import TrainingJob, ModelVersion, TrainingStatusEnum, ModelTypeEnum
 from app.models.analytics import FeedbackAnalytics
 from app.models.knowledge_base import Document, DocumentTypeEnum, DocumentStatusEnum, KnowledgeBaseTierEnum
 from app.core.security import security_manager
@@ -121,7 +123,7 @@ def sample_documents():
                 file_size=1024,
                 file_type=DocumentTypeEnum.PDF,
                 mime_type="application/pdf",
-                file_hash=f"test_hash_{i+1}",
+                file_hash=hashlib.sha256(f"test_hash_{i+1}".encode()).digest(),
                 extracted_text=f"This is test document {i+1} content for training",
                 knowledge_base_tier=KnowledgeBaseTierEnum.CUSTOMER,  # All tier 1 documents
                 category="maintenance",
@@ -273,6 +275,48 @@ class TestTrainingJobAPI:
         for job in jobs:
             assert job["status"] == "pending"
 
+    def test_get_training_jobs_keyset_pagination(self, client, admin_headers):
+        """Test get training jobs with before_id cursor"""
+        job_data = {
+            "name": "Keyset Training Job",
+            "training_type": "incremental",
+            "model_type": "embedding",
+            "knowledge_base_tier": 1
+        }
+
+        for _ in range(3):
+            client.post("/v1/training/jobs", headers=admin_headers, json=job_data)
+
+        first_page = client.get("/v1/training/jobs?limit=2", headers=admin_headers)
+        assert first_page.status_code == 200
+        next_before = int(first_page.headers["X-Next-Before-Id"])
+        assert next_before == first_page.json()[-1]["id"]
+
+        second_page = client.get(f"/v1/training/jobs?limit=2&before_id={next_before}", headers=admin_headers)
+        assert second_page.status_code == 200
+        jobs = second_page.json()
+        assert all(job["id"] < next_before for job in jobs)
+        assert [job["id"] for job in jobs] == sorted((job["id"] for job in jobs), reverse=True)
+
+        # Offset pages use the same id order, so the cursor continues them exactly
+        first_ids = [job["id"] for job in first_page.json()]
+        assert first_ids == sorted(first_ids, reverse=True)
+
+        last_page = client.get("/v1/training/jobs?limit=1000", headers=admin_headers)
+        assert last_page.status_code == 200
+        assert "X-Next-Before-Id" not in last_page.headers
+
+
+    def test_get_training_jobs_cursor_readable_cross_origin(self, client, admin_headers):
+        """Test browsers on an allowed origin may read the cursor header"""
+        response = client.get(
+            "/v1/training/jobs?limit=1",
+            headers={**admin_headers, "Origin": settings.cors_origins[0]}
+        )
+
+        assert response.status_code == 200
+        exposed = response.headers["access-control-expose-headers"].lower().split(", ")
+        assert "x-next-before-id" in exposed
 
 class TestModelVersionAPI:
     """Model version API tests"""
@@ -304,6 +348,87 @@ class TestModelVersionAPI:
         for model in models:
             assert model["is_deployed"] == True
 
+    def test_get_model_versions_exact_tier(self, client, admin_headers):
+        """Test a requested tier returns only that tier, not every tier below it"""
+        db = TestingSessionLocal()
+        try:
+            for tier in (1, 2, 3):
+                db.add(ModelVersion(
+                    training_job_id=1,
+                    version_number=f"v1.tier.{tier}",
+                    model_type=ModelTypeEnum.EMBEDDING,
+                    knowledge_base_tier=tier,
+                    model_file_path=f"/models/tier/{tier}/model.bin"
+                ))
+            db.commit()
+        finally:
+            db.close()
+
+        response = client.get("/v1/training/models?knowledge_base_tier=2&limit=1000", headers=admin_headers)
+
+        assert response.status_code == 200
+        tiers = {model["knowledge_base_tier"] for model in response.json()}
+        assert tiers == {2}
+
+    def test_get_model_versions_keyset_pagination(self, client, admin_headers):
+        """Test model version pages follow the id cursor even when created_at ties"""
+        db = TestingSessionLocal()
+        try:
+            created_at = datetime(2026, 1, 1, 12, 0, 0)
+            for i in range(3):
+                db.add(ModelVersion(
+                    training_job_id=1,
+                    version_number=f"v1.keyset.{i}",
+                    model_type=ModelTypeEnum.EMBEDDING,
+                    knowledge_base_tier=1,
+                    model_file_path=f"/models/keyset/{i}/model.bin",
+                    created_at=created_at
+                ))
+            db.commit()
+        finally:
+            db.close()
+
+        first_page = client.get("/v1/training/models?limit=2", headers=admin_headers)
+        assert first_page.status_code == 200
+        first_ids = [model["id"] for model in first_page.json()]
+        assert first_ids == sorted(first_ids, reverse=True)
+        next_before = int(first_page.headers["X-Next-Before-Id"])
+        assert next_before == min(first_ids)
+
+        second_page = client.get(f"/v1/training/models?limit=2&before_id={next_before}", headers=admin_headers)
+        assert second_page.status_code == 200
+        assert all(model["id"] < next_before for model in second_page.json())
+
+        last_page = client.get("/v1/training/models?limit=1000", headers=admin_headers)
+        assert "X-Next-Before-Id" not in last_page.headers
+
+
+    def test_get_model_versions_pages_cross_origin(self, client, admin_headers):
+        """Test a browser client on an allowed origin can follow the cursor"""
+        db = TestingSessionLocal()
+        try:
+            for i in range(3):
+                db.add(ModelVersion(
+                    training_job_id=1,
+                    version_number=f"v1.cors.{i}",
+                    model_type=ModelTypeEnum.EMBEDDING,
+                    knowledge_base_tier=1,
+                    model_file_path=f"/models/cors/{i}/model.bin"
+                ))
+            db.commit()
+        finally:
+            db.close()
+
+        cors_headers = {**admin_headers, "Origin": settings.cors_origins[0]}
+        first_page = client.get("/v1/training/models?limit=2", headers=cors_headers)
+        assert first_page.status_code == 200
+        exposed = first_page.headers["access-control-expose-headers"].lower().split(", ")
+        assert "x-next-before-id" in exposed
+
+        next_before = first_page.headers["X-Next-Before-Id"]
+        second_page = client.get(f"/v1/training/models?limit=2&before_id={next_before}", headers=cors_headers)
+        assert second_page.status_code == 200
+        assert all(model["id"] < int(next_before) for model in second_page.json())
 
 class TestFeedbackAPI:
     """Feedback API tests"""
@@ -0,0 +1,26 @@
+"""
+Test settings parsing helpers
+"""
+import pytest
+from app.core.config import Settings
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("50MB", 50 * 1024 * 1024),
+    ("512kb", 512 * 1024),
+    ("2GB", 2 * 1024 * 1024 * 1024),
+    (" 10 MB ", 10 * 1024 * 1024),
+    ("100B", 100),
+    ("1024", 1024),
+])
+def test_max_file_size_bytes(value, expected):
+    """Size strings with and without a suffix are converted to bytes"""
+    config = Settings(MAX_FILE_SIZE=value)
+    assert config.max_file_size_bytes == expected
+
+
+def test_max_file_size_bytes_rejects_unknown_suffix():
+    """Unsupported suffixes such as "1M" still fail to parse"""
+    config = Settings(MAX_FILE_SIZE="1M")
+    with pytest.raises(ValueError):
+        _ = config.max_file_size_bytes
@@ -0,0 +1,51 @@
+"""
+Test DatabaseManager raw queries and bulk inserts
+"""
+import pytest
+from sqlalchemy import create_engine, event
+
+from app.core.database import DatabaseManager
+from app.models.analytics import PerformanceMetrics
+
+
+@pytest.fixture
+def manager():
+    """Database manager bound to an in-memory database"""
+    db_manager = DatabaseManager()
+    db_manager.engine = create_engine("sqlite://")
+    PerformanceMetrics.__table__.create(db_manager.engine)
+    return db_manager
+
+
+def test_bulk_insert_empty_list_runs_no_statement(manager):
+    """An empty batch is a no-op rather than an INSERT without values"""
+    statements = []
+    event.listen(manager.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    manager.bulk_insert(PerformanceMetrics, [])
+
+    assert statements == []
+
+
+def test_bulk_insert_and_query(manager):
+    """Rows inserted in bulk are visible to execute_query"""
+    manager.bulk_insert(PerformanceMetrics, [
+        {"endpoint": "/v1/query/ask", "method": "POST", "response_time_ms": 120, "status_code": 200},
+        {"endpoint": "/v1/query/ask", "method": "POST", "response_time_ms": 80, "status_code": 200},
+    ])
+
+    rows = manager.execute_query(
+        "SELECT response_time_ms FROM performance_metrics WHERE endpoint = :endpoint ORDER BY response_time_ms",
+        {"endpoint": "/v1/query/ask"}
+    )
+
+    assert rows == [{"response_time_ms": 80}, {"response_time_ms": 120}]
+
+
+def test_execute_query_returns_rowcount_for_dml(manager):
+    """Statements without rows report how many rows they touched"""
+    manager.bulk_insert(PerformanceMetrics, [
+        {"endpoint": "/v1/query/ask", "method": "POST", "response_time_ms": 120, "status_code": 200},
+    ])
+
+    assert manager.execute_query("DELETE FROM performance_metrics WHERE status_code = :code", {"code": 200}) == 1
@@ -0,0 +1,73 @@
+"""
+Test batched document ingestion into the per-tier Weaviate collections
+"""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from app.services.ai_service import AIService
+from app.services.weaviate_collections import document_collection_name
+
+
+@pytest.fixture
+def collections():
+    """Stubbed tier collections whose insert_many succeeds"""
+    return {
+        document_collection_name(tier): MagicMock(data=MagicMock(
+            insert_many=AsyncMock(return_value=SimpleNamespace(errors={}))
+        ))
+        for tier in (1, 2, 3)
+    }
+
+
+@pytest.fixture
+def service(collections):
+    """AI service with a ready Weaviate and fixed embeddings"""
+    with patch.object(AIService, "_initialize_clients"):
+        ai = AIService()
+    ai.weaviate_client = MagicMock()
+    ai._weaviate_ready = True  # pylint: disable=protected-access
+    ai._async_collection = AsyncMock(side_effect=collections.get)  # pylint: disable=protected-access
+    ai.generate_embeddings_many = AsyncMock(side_effect=lambda texts: [np.ones(4, dtype=np.float32)] * len(texts))
+    return ai
+
+
+def _document(doc_id, tier):
+    return {
+        "doc_id": doc_id,
+        "title": f"Manual {doc_id}",
+        "content": "Check the bearings.",
+        "knowledge_base_tier": tier,
+        "metadata": {"equipment": "pump"}
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_embeds_once_and_inserts_once_per_tier(service, collections):
+    """All contents share one embedding call; each tier gets one insert_many"""
+    stored = await service.store_documents_batch([_document(1, 1), _document(2, 2), _document(3, 1)])
+
+    assert stored == 3
+    service.generate_embeddings_many.assert_awaited_once()
+    assert len(collections[document_collection_name(1)].data.insert_many.call_args.args[0]) == 2
+    assert len(collections[document_collection_name(2)].data.insert_many.call_args.args[0]) == 1
+    collections[document_collection_name(3)].data.insert_many.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_batch_counts_only_stored_documents(service, collections):
+    """Per-object insert errors are left out of the stored count"""
+    collections[document_collection_name(1)].data.insert_many.return_value = SimpleNamespace(
+        errors={0: SimpleNamespace(message="bad vector")}
+    )
+
+    assert await service.store_documents_batch([_document(1, 1), _document(2, 1)]) == 1
+
+
+@pytest.mark.asyncio
+async def test_single_document_goes_through_the_batch(service, collections):
+    """store_document_in_weaviate is a one-document batch"""
+    assert await service.store_document_in_weaviate(7, "Pump manual", "Check the bearings.", 2, {}) is True
+    collections[document_collection_name(2)].data.insert_many.assert_awaited_once()
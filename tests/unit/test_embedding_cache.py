@@ -0,0 +1,79 @@
+"""
+Test the Redis-backed embedding cache
+"""
+import numpy as np
+import pytest
+
+from app.services.embedding_cache import EmbeddingCache
+from tests.fixtures.fake_redis import FakeRedis
+
+
+@pytest.fixture
+def cache():
+    """Embedding cache with a two-entry LRU in front of an in-memory Redis"""
+    embedding_cache = EmbeddingCache("test-model", ttl_seconds=60, memory_size=2)
+    embedding_cache.redis = FakeRedis()
+    return embedding_cache
+
+
+def _vector(value):
+    return np.full(4, value, dtype=np.float32)
+
+
+@pytest.mark.asyncio
+async def test_miss_then_hit_from_memory(cache):
+    """Stored vectors come back from the LRU without a Redis round trip"""
+    assert await cache.get_many(["pump"]) == [None]
+    assert cache.redis.mget_calls == 1
+
+    await cache.put_many(["pump"], [_vector(1.0)])
+    vectors = await cache.get_many(["pump"])
+
+    np.testing.assert_array_equal(vectors[0], _vector(1.0))
+    assert cache.redis.mget_calls == 1
+    assert cache.redis.pipelines_executed == 1
+    assert set(cache.redis.ttls.values()) == {60}
+
+
+@pytest.mark.asyncio
+async def test_memory_misses_share_one_mget(cache):
+    """Texts missing from the LRU are fetched from Redis in a single MGET"""
+    await cache.put_many(["a", "b"], [_vector(1.0), _vector(2.0)])
+    cache._memory.clear()  # pylint: disable=protected-access
+
+    vectors = await cache.get_many(["a", "b", "c"])
+
+    np.testing.assert_array_equal(vectors[0], _vector(1.0))
+    np.testing.assert_array_equal(vectors[1], _vector(2.0))
+    assert vectors[2] is None
+    assert cache.redis.mget_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_least_recently_used(cache):
+    """Past memory_size the least recently used vector falls back to Redis"""
+    await cache.put_many(["a", "b"], [_vector(1.0), _vector(2.0)])
+    await cache.get_many(["a"])
+    await cache.put_many(["c"], [_vector(3.0)])
+
+    recent = await cache.get_many(["a", "c"])
+
+    np.testing.assert_array_equal(recent[0], _vector(1.0))
+    np.testing.assert_array_equal(recent[1], _vector(3.0))
+    assert cache.redis.mget_calls == 0
+
+    vectors = await cache.get_many(["b"])
+
+    np.testing.assert_array_equal(vectors[0], _vector(2.0))
+    assert cache.redis.mget_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_are_misses(cache):
+    """An unavailable Redis degrades to cache misses instead of raising"""
+    cache.redis.fail = True
+
+    await cache.put_many(["pump"], [_vector(1.0)])
+    cache._memory.clear()  # pylint: disable=protected-access
+
+    assert await cache.get_many(["pump"]) == [None]
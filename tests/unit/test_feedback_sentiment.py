@@ -0,0 +1,37 @@
+"""
+Test keyword sentiment scoring of feedback text
+"""
+import pytest
+
+from app.services.training_service import TrainingService
+
+
+def _reference_sentiment(text):
+    """Original scoring: each keyword counted once if it is a substring"""
+    positive_words = ['good', 'great', 'excellent', 'helpful', 'useful', 'accurate', 'clear']
+    negative_words = ['bad', 'poor', 'terrible', 'unhelpful', 'useless', 'wrong', 'confusing']
+    text_lower = text.lower()
+    positive_count = sum(1 for word in positive_words if word in text_lower)
+    negative_count = sum(1 for word in negative_words if word in text_lower)
+    if positive_count > negative_count:
+        return "positive"
+    if negative_count > positive_count:
+        return "negative"
+    return "neutral"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("text", [
+    "Great answer, very helpful",
+    "Good good good but wrong and confusing",
+    "Unhelpful",
+    "Not bad, the steps were CLEAR",
+    "The answer was accurateexcellent",
+    "Goodness, that was badly worded",
+    "",
+])
+async def test_sentiment_matches_substring_scoring(text):
+    """Regex scoring gives the same result as the substring scan it replaced"""
+    service = TrainingService()
+
+    assert await service._analyze_sentiment(text) == _reference_sentiment(text)  # pylint: disable=protected-access
@@ -0,0 +1,39 @@
+"""
+Test the JSON key filters that back the MySQL functional indexes
+"""
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import Session
+
+from app.core.database import json_key_sql
+from app.models.analytics import AnalyticsEvent, ErrorLog, ErrorSeverityEnum
+from app.models.knowledge_base import SearchQuery
+
+
+def _mysql_sql(clause):
+    return str(clause.compile(dialect=mysql.dialect()))
+
+
+def test_filters_render_the_indexed_expression_on_mysql():
+    """The MySQL filter text is the exact expression the index was built on"""
+    assert json_key_sql("analytics_events.event_data", "feature", 100) in _mysql_sql(AnalyticsEvent.feature_equals("x"))
+    assert json_key_sql("error_logs.request_data", "path", 255) in _mysql_sql(ErrorLog.request_path_equals("/x"))
+    assert json_key_sql("search_queries.search_scope", "category", 255) in _mysql_sql(SearchQuery.scope_category_equals("x"))
+    assert "COLLATE utf8mb4_bin" in json_key_sql("request_data", "path", 255)
+
+
+def test_filter_matches_key_on_other_databases():
+    """Elsewhere the filter falls back to a plain JSON extraction"""
+    engine = create_engine("sqlite://")
+    ErrorLog.__table__.create(engine)
+    with Session(engine) as db:
+        db.add(ErrorLog(
+            error_message="boom",
+            error_type="RuntimeError",
+            severity=ErrorSeverityEnum.LOW,
+            request_data={"path": "/v1/query/ask"}
+        ))
+        db.commit()
+
+        assert len(db.scalars(select(ErrorLog.id).where(ErrorLog.request_path_equals("/v1/query/ask"))).all()) == 1
+        assert db.scalars(select(ErrorLog.id).where(ErrorLog.request_path_equals("/v1/query"))).all() == []
@@ -0,0 +1,31 @@
+"""
+Test application startup and shutdown
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import main
+
+
+@pytest.mark.asyncio
+async def test_shutdown_closes_every_resource_when_one_fails():
+    """A failing close is logged and the remaining resources still close"""
+    email_service = MagicMock()
+    email_service.close.side_effect = RuntimeError("smtp gone")
+    otp_manager = MagicMock(close=AsyncMock())
+    close_db = AsyncMock()
+    fake_app = MagicMock()
+
+    with patch.object(main, "init_db", AsyncMock()), \
+            patch.object(main, "close_db", close_db), \
+            patch.object(main, "get_email_service", return_value=email_service), \
+            patch.object(main, "get_otp_manager", return_value=otp_manager), \
+            patch.object(main.ai_service, "start"), \
+            patch.object(main.ai_service, "aclose", AsyncMock(side_effect=RuntimeError("weaviate gone"))):
+        async with main.lifespan(fake_app):
+            pass
+
+    close_db.assert_awaited_once()
+    email_service.close.assert_called_once()
+    otp_manager.close.assert_awaited_once()
@@ -0,0 +1,48 @@
+"""
+Test model to_dict output stays JSON-safe for any encoder
+"""
+import json
+from datetime import datetime
+
+from app.models.training import ModelTypeEnum, TrainingJob, TrainingStatusEnum, TrainingTypeEnum
+from app.models.user import LanguageEnum, User, UserRoleEnum, UserStatusEnum
+
+
+def test_user_to_dict_is_json_safe():
+    """Enums become their values and datetimes ISO strings"""
+    user = User(
+        id=1,
+        email="engineer@test.com",
+        full_name="Test Engineer",
+        role=UserRoleEnum.ENGINEER,
+        status=UserStatusEnum.APPROVED,
+        preferred_language=LanguageEnum.ENGLISH,
+        created_at=datetime(2026, 1, 2, 3, 4, 5),
+    )
+
+    data = user.to_dict()
+
+    assert type(data["role"]) is str and data["role"] == UserRoleEnum.ENGINEER.value
+    assert data["created_at"] == "2026-01-02T03:04:05"
+    assert data["approved_at"] is None
+    assert json.loads(json.dumps(data)) == data
+
+
+def test_training_job_to_dict_is_json_safe():
+    """Enums become their values and datetimes ISO strings"""
+    job = TrainingJob(
+        id=1,
+        name="Nightly",
+        training_type=TrainingTypeEnum.INCREMENTAL,
+        model_type=ModelTypeEnum.EMBEDDING,
+        status=TrainingStatusEnum.PENDING,
+        knowledge_base_tier=1,
+        created_by="admin@test.com",
+        created_at=datetime(2026, 1, 2, 3, 4, 5),
+    )
+
+    data = job.to_dict()
+
+    assert type(data["status"]) is str and data["status"] == "pending"
+    assert data["created_at"] == "2026-01-02T03:04:05"
+    assert json.loads(json.dumps(data)) == data
@@ -0,0 +1,70 @@
+"""
+Test OTP storage and verification against Redis
+"""
+import asyncio
+import pytest
+
+from app.core.security import OTPManager
+from tests.fixtures.fake_redis import FakeRedis
+
+
+@pytest.fixture
+def otp_manager():
+    """OTP manager backed by an in-memory Redis"""
+    manager = OTPManager()
+    manager.redis = FakeRedis()
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_verify_otp_success_consumes_code(otp_manager):
+    """A correct OTP verifies once and is then gone"""
+    otp = await otp_manager.generate_otp("user@test.com")
+
+    assert await otp_manager.verify_otp("user@test.com", otp) is True
+    assert await otp_manager.verify_otp("user@test.com", otp) is False
+
+
+@pytest.mark.asyncio
+async def test_verify_otp_locks_out_after_max_attempts(otp_manager):
+    """The correct OTP is refused once MAX_ATTEMPTS wrong guesses were made"""
+    otp = await otp_manager.generate_otp("user@test.com")
+    wrong = "000000" if otp != "000000" else "111111"
+
+    for _ in range(OTPManager.MAX_ATTEMPTS):
+        assert await otp_manager.verify_otp("user@test.com", wrong) is False
+
+    assert await otp_manager.verify_otp("user@test.com", otp) is False
+
+
+@pytest.mark.asyncio
+async def test_concurrent_guesses_respect_attempt_limit(otp_manager):
+    """Guesses fired in parallel cannot exceed MAX_ATTEMPTS comparisons"""
+    otp = await otp_manager.generate_otp("user@test.com")
+    guesses = [f"{i:06d}" for i in range(20) if f"{i:06d}" != otp] + [otp]
+
+    compared = []
+    original_get = otp_manager.redis.get
+
+    async def counting_get(key):
+        compared.append(key)
+        return await original_get(key)
+
+    otp_manager.redis.get = counting_get
+    results = await asyncio.gather(*(otp_manager.verify_otp("user@test.com", guess) for guess in guesses))
+
+    assert len(compared) <= OTPManager.MAX_ATTEMPTS
+    assert results[-1] is False
+
+
+@pytest.mark.asyncio
+async def test_concurrent_correct_otp_succeeds_once(otp_manager):
+    """Two parallel requests with the right OTP cannot both succeed"""
+    otp = await otp_manager.generate_otp("user@test.com")
+
+    results = await asyncio.gather(
+        otp_manager.verify_otp("user@test.com", otp),
+        otp_manager.verify_otp("user@test.com", otp)
+    )
+
+    assert sorted(results) == [False, True]
@@ -0,0 +1,159 @@
+"""
+Test the semantic response cache and streaming query pipeline
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import orjson
+import pytest
+
+from app.core.config import settings
+from app.services.ai_service import AIService
+from app.services.weaviate_collections import RESPONSE_CACHE_COLLECTION
+
+QUERY_VECTOR = np.ones(4, dtype=np.float32)
+
+
+@pytest.fixture
+def collection():
+    """Stubbed Weaviate ResponseCache collection that finds nothing"""
+    stub = MagicMock()
+    stub.query.near_vector = AsyncMock(return_value=SimpleNamespace(objects=[]))
+    stub.data.insert = AsyncMock()
+    return stub
+
+
+@pytest.fixture
+def service(collection):
+    """AI service with no real clients, a ready Weaviate and a fixed embedding"""
+    with patch.object(AIService, "_initialize_clients"):
+        ai = AIService()
+    ai.weaviate_client = MagicMock()
+    ai._weaviate_ready = True  # pylint: disable=protected-access
+    ai._async_collection = AsyncMock(return_value=collection)  # pylint: disable=protected-access
+    ai.generate_embeddings = AsyncMock(return_value=QUERY_VECTOR)
+    ai.search_similar_documents = AsyncMock(return_value=[])
+    return ai
+
+
+def _cache_hit(response):
+    return SimpleNamespace(objects=[SimpleNamespace(properties={"response": orjson.dumps(response).decode()})])
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_returns_stored_response(service, collection):
+    """A near-duplicate query returns the stored response"""
+    collection.query.near_vector.return_value = _cache_hit({"response": "Check the bearings.", "confidence": 0.8})
+
+    cached = await service.get_cached_response(QUERY_VECTOR, "engineer", 2)
+
+    assert cached == {"response": "Check the bearings.", "confidence": 0.8}
+    service._async_collection.assert_awaited_once_with(RESPONSE_CACHE_COLLECTION)  # pylint: disable=protected-access
+    kwargs = collection.query.near_vector.call_args.kwargs
+    assert kwargs["limit"] == 1
+    assert kwargs["distance"] == pytest.approx(1.0 - settings.response_cache_min_similarity)
+
+
+@pytest.mark.asyncio
+async def test_cache_miss_returns_none(service):
+    """No close enough entry is a miss"""
+    assert await service.get_cached_response(QUERY_VECTOR, "engineer", 2) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_skipped_while_weaviate_unavailable(service, collection):
+    """Lookups and stores are no-ops until Weaviate passes its readiness probe"""
+    service._weaviate_ready = False  # pylint: disable=protected-access
+
+    assert await service.get_cached_response(QUERY_VECTOR, "engineer", 2) is None
+    await service.cache_response("q", QUERY_VECTOR, "engineer", 2, {"response": "r", "model_used": "m"})
+
+    collection.query.near_vector.assert_not_awaited()
+    collection.data.insert.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_cache_errors_are_misses(service, collection):
+    """Weaviate errors are logged, never raised to the query pipeline"""
+    collection.query.near_vector.side_effect = RuntimeError("weaviate down")
+    collection.data.insert.side_effect = RuntimeError("weaviate down")
+
+    assert await service.get_cached_response(QUERY_VECTOR, "engineer", 2) is None
+    await service.cache_response("q", QUERY_VECTOR, "engineer", 2, {"response": "r", "model_used": "m"})
+
+
+@pytest.mark.asyncio
+async def test_cache_response_stores_only_reusable_fields(service, collection):
+    """Per-request fields such as processing_time are not cached"""
+    await service.cache_response("q", QUERY_VECTOR, "engineer", 2, {
+        "response": "r", "confidence": 0.8, "sources": [], "model_used": "m", "processing_time": 1.5
+    })
+
+    kwargs = collection.data.insert.call_args.kwargs
+    assert kwargs["vector"] is QUERY_VECTOR
+    assert kwargs["properties"]["user_role"] == "engineer"
+    assert kwargs["properties"]["knowledge_base_tier"] == 2
+    assert orjson.loads(kwargs["properties"]["response"]) == {
+        "response": "r", "confidence": 0.8, "sources": [], "model_used": "m"
+    }
+
+
+@pytest.mark.asyncio
+async def test_stream_cache_hit_yields_one_chunk(service, collection):
+    """A cache hit streams the stored text without calling the model"""
+    collection.query.near_vector.return_value = _cache_hit({"response": "Check the bearings.", "confidence": 0.8})
+    service.genai_model = MagicMock()
+
+    metadata, chunks = await service.process_query_stream("pump noise?", "engineer", 2)
+
+    assert metadata == {"confidence": 0.8}
+    assert await _collect(chunks) == ["Check the bearings."]
+    service.genai_model.generate_content_async.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cache_lookup_and_search_overlap(service):
+    """The response cache lookup and the document search run concurrently"""
+    searching = asyncio.Event()
+
+    async def search(*args, **kwargs):
+        searching.set()
+        return [{"doc_id": 1, "title": "Pump manual", "content": "Check the bearings."}]
+
+    async def lookup(*args):
+        # Only returns if the search started while the lookup was pending
+        await asyncio.wait_for(searching.wait(), timeout=1)
+
+    service.search_similar_documents = search
+    service.get_cached_response = lookup
+    service.genai_model = MagicMock(generate_content_async=AsyncMock(return_value=SimpleNamespace(text="Check the bearings.")))
+
+    result = await service.process_query("pump noise?", "engineer", 2)
+
+    assert result["sources"][0]["document_id"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_miss_caches_full_model_response(service, collection):
+    """A streamed model response is cached once all chunks were consumed"""
+    async def stream():
+        for text in ("Check the ", "bearings."):
+            yield SimpleNamespace(text=text)
+
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(return_value=stream())
+    service.genai_model = model
+
+    metadata, chunks = await service.process_query_stream("pump noise?", "engineer", 2)
+
+    assert metadata["model_used"] == settings.gemini_model
+    collection.data.insert.assert_not_awaited()
+    assert await _collect(chunks) == ["Check the ", "bearings."]
+    stored = orjson.loads(collection.data.insert.call_args.kwargs["properties"]["response"])
+    assert stored["response"] == "Check the bearings."
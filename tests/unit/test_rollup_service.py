@@ -0,0 +1,109 @@
+"""
+Test the user query daily roll-up refresh
+"""
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.user import UserQuery
+from app.models.analytics import SystemMetrics, UserQueryDaily
+from app.services.rollup_service import ensure_metric_partitions, refresh_rollups
+
+
+@pytest.fixture
+def session_factory():
+    """In-memory database holding only the tables the roll-up touches"""
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    UserQuery.__table__.create(engine)
+    UserQueryDaily.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def _add_query(db, created_at, tier, processing_time_ms, rating=None):
+    db.add(UserQuery(
+        query_text="How do I reset the pump?",
+        knowledge_base_tier=tier,
+        processing_time_ms=processing_time_ms,
+        satisfaction_rating=rating,
+        created_at=created_at
+    ))
+
+
+def test_refresh_aggregates_per_day_and_tier(session_factory):
+    """Recent days are grouped by day and tier; older days are left alone"""
+    with session_factory() as db:
+        db.add(UserQueryDaily(day=date(2026, 1, 1), knowledge_base_tier=1, query_count=7))
+        _add_query(db, datetime(2026, 1, 1, 9), 1, 100)
+        _add_query(db, datetime(2026, 1, 9, 9), 1, 100, rating=4)
+        _add_query(db, datetime(2026, 1, 9, 17), 1, 300, rating=2)
+        _add_query(db, datetime(2026, 1, 10, 8), 2, 50)
+        db.commit()
+
+    refresh_rollups(lookback_days=1, today=date(2026, 1, 10), session_factory=session_factory)
+
+    with session_factory() as db:
+        rows = {
+            (row.day, row.knowledge_base_tier): row
+            for row in db.query(UserQueryDaily).all()
+        }
+
+    assert set(rows) == {(date(2026, 1, 1), 1), (date(2026, 1, 9), 1), (date(2026, 1, 10), 2)}
+    assert rows[(date(2026, 1, 1), 1)].query_count == 7
+    assert rows[(date(2026, 1, 9), 1)].query_count == 2
+    assert rows[(date(2026, 1, 9), 1)].avg_processing_time_ms == 200
+    assert rows[(date(2026, 1, 9), 1)].avg_satisfaction_rating == 3
+    assert rows[(date(2026, 1, 10), 2)].avg_satisfaction_rating is None
+
+
+def test_refresh_replaces_stale_rows(session_factory):
+    """Re-running the refresh rewrites recent rows instead of adding to them"""
+    with session_factory() as db:
+        _add_query(db, datetime(2026, 1, 10, 8), 1, 80)
+        db.commit()
+
+    refresh_rollups(today=date(2026, 1, 10), session_factory=session_factory)
+    refresh_rollups(today=date(2026, 1, 10), session_factory=session_factory)
+
+    with session_factory() as db:
+        rows = db.query(UserQueryDaily).all()
+
+    assert [(row.day, row.query_count) for row in rows] == [(date(2026, 1, 10), 1)]
+
+
+def _mysql_session(partition_names):
+    """Session on MySQL whose information_schema lists partition_names for system_metrics"""
+    db = MagicMock()
+    db.__enter__.return_value = db
+    db.get_bind.return_value.dialect.name = "mysql"
+    db.execute.return_value.scalars.return_value.all.return_value = partition_names
+    return db
+
+
+def _executed_sql(db):
+    return [str(call.args[0]) for call in db.execute.call_args_list]
+
+
+def test_partitions_skip_unpartitioned_table():
+    """An existing table without partitions is left alone instead of failing on p_future"""
+    db = _mysql_session([None])
+
+    added = ensure_metric_partitions(today=date(2026, 3, 15), session_factory=lambda: db)
+
+    assert added == []
+    assert not any("REORGANIZE" in sql for sql in _executed_sql(db))
+
+
+def test_partitions_split_months_after_newest():
+    """Missing months after the newest partition are split out of p_future in order"""
+    db = _mysql_session(["p202601", "p202602", "p_future"])
+
+    added = SystemMetrics.ensure_month_partitions(db, date(2026, 4, 1))
+
+    assert added == ["p202603", "p202604"]
+    reorganized = [sql for sql in _executed_sql(db) if "REORGANIZE PARTITION p_future" in sql]
+    assert len(reorganized) == 2
+    assert "PARTITION p202603 VALUES LESS THAN (TO_DAYS('2026-04-01'))" in reorganized[0]
@@ -0,0 +1,67 @@
+"""
+Test training model relationships load only when asked for
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  pylint: disable=unused-import
+from app.core.database import Base
+from app.models.training import ModelTypeEnum, ModelVersion, TrainingJob, TrainingTypeEnum
+
+
+def _engine_with_job():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        job = TrainingJob(
+            name="Nightly",
+            training_type=TrainingTypeEnum.INCREMENTAL,
+            model_type=ModelTypeEnum.EMBEDDING,
+            knowledge_base_tier=1,
+            training_config={"epochs": 1},
+            created_by="admin@test.com"
+        )
+        db.add(job)
+        db.flush()
+        db.add(ModelVersion(
+            training_job_id=job.id,
+            version_number="v1.1.0",
+            model_type=ModelTypeEnum.EMBEDDING,
+            knowledge_base_tier=1,
+            model_file_path="/models/1/v1.1.0/model.bin"
+        ))
+        db.commit()
+    return engine
+
+
+def _count_selects(engine):
+    statements = []
+    event.listen(
+        engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    return statements
+
+
+def test_single_job_lookup_runs_one_select():
+    """Loading a job does not also load its versions and their evaluations"""
+    engine = _engine_with_job()
+    statements = _count_selects(engine)
+
+    with Session(engine) as db:
+        db.get(TrainingJob, 1)
+
+    assert len(statements) == 1
+
+
+def test_query_with_all_eager_loads_children():
+    """The full job view loads versions and evaluations up front"""
+    engine = _engine_with_job()
+
+    with Session(engine) as db:
+        job = db.scalars(TrainingJob.query_with_all()).one()
+        statements = _count_selects(engine)
+        versions = [(version.version_number, version.evaluations) for version in job.model_versions]
+
+    assert versions == [("v1.1.0", [])]
+    assert statements == []